@@ -8,13 +8,20 @@ import org.springframework.stereotype.Component;
 import java.io.IOException;
 import java.nio.file.Files;
 import java.nio.file.Path;
+import java.nio.file.attribute.FileTime;
+import java.util.Map;
 import java.util.Optional;
+import java.util.concurrent.ConcurrentHashMap;
 
 @Component
 public class DataRepository {
 
+    private static final String CURRENT_POINTER = "CURRENT";
+    private static final String GENERATIONS_DIR = "generations";
+
     private final ObjectMapper objectMapper;
     private final Path dataRoot;
+    private final Map<Path, CachedJson> cache = new ConcurrentHashMap<>();
 
     public DataRepository(ObjectMapper objectMapper, @Value("${tickervista.data-root:data}") String dataRoot) {
         this.objectMapper = objectMapper;
@@ -34,8 +41,56 @@ public class DataRepository {
         }
     }
 
+    /**
+     * Like {@link #readJson} but keeps the parsed tree until the file's modification time or size changes.
+     * Meant for large, read-mostly files such as the symbol search index; the worker replaces files by
+     * rename, so a new version always shows up as a new modification time (or a new generation path).
+     * Entries for files that were deleted, e.g. garbage-collected generations, are dropped on the next miss.
+     */
+    public Optional<JsonNode> readJsonCached(String... segments) throws IOException {
+        Path path = resolvePath(segments);
+        if (!Files.isRegularFile(path)) {
+            cache.remove(path);
+            return Optional.empty();
+        }
+        FileTime modified = Files.getLastModifiedTime(path);
+        long size = Files.size(path);
+        CachedJson cached = cache.get(path);
+        if (cached != null && cached.modified().equals(modified) && cached.size() == size) {
+            return Optional.of(cached.node());
+        }
+        JsonNode node;
+        try (var inputStream = Files.newInputStream(path)) {
+            node = objectMapper.readTree(inputStream);
+        }
+        cache.keySet().removeIf(key -> !Files.exists(key));
+        cache.put(path, new CachedJson(modified, size, node));
+        return Optional.of(node);
+    }
+
+    /**
+     * The generation named by {@code CURRENT} when the worker publishes generations, otherwise the data root.
+     * The pointer is read per request so a new generation is picked up as soon as it is switched.
+     */
+    private Path publishedRoot() throws IOException {
+        Path pointer = dataRoot.resolve(CURRENT_POINTER);
+        if (!Files.isRegularFile(pointer)) {
+            return dataRoot;
+        }
+        String generation = Files.readString(pointer).trim();
+        if (generation.isEmpty() || generation.contains("/") || generation.contains("\\") || generation.startsWith(".")) {
+            return dataRoot;
+        }
+        Path root = dataRoot.resolve(GENERATIONS_DIR).resolve(generation).normalize();
+        return Files.isDirectory(root) ? root : dataRoot;
+    }
+
+    private record CachedJson(FileTime modified, long size, JsonNode node) {
+    }
+
     private Path resolvePath(String... segments) throws IOException {
-        Path current = dataRoot;
+        Path root = publishedRoot();
+        Path current = root;
         for (String segment : segments) {
             if (segment == null) {
                 throw new IOException("Path segment must not be null");
@@ -57,7 +112,7 @@ public class DataRepository {
             current = current.resolve(relative);
         }
         Path normalized = current.normalize();
-        if (!normalized.startsWith(dataRoot)) {
+        if (!normalized.startsWith(root)) {
             throw new IOException("Attempt to access path outside the data root");
         }
         return normalized;
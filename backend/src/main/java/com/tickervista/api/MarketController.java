@@ -13,7 +13,10 @@ import org.springframework.web.bind.annotation.RestController;
 
 import java.io.IOException;
 import java.nio.file.Path;
+import java.util.List;
 import java.util.Locale;
+import java.util.Optional;
+import java.util.Set;
 import java.util.regex.Pattern;
 
 @RestController
@@ -21,6 +24,9 @@ import java.util.regex.Pattern;
 public class MarketController {
 
     private static final Pattern SYMBOL_PATTERN = Pattern.compile("^[A-Za-z0-9][A-Za-z0-9._^\\-]{0,31}$");
+    private static final String DAILY_TIMEFRAME = "1d";
+    private static final Set<String> DERIVED_TIMEFRAMES = Set.of("1w", "1mo");
+    private static final Set<String> CHART_RANGES = Set.of("1M", "3M", "6M", "1Y", "2Y", "5Y", "10Y");
 
     private final DataRepository repository;
     private final ObjectMapper objectMapper;
@@ -58,6 +64,25 @@ public class MarketController {
                 .orElseGet(MarketController::notFound);
     }
 
+    @GetMapping("/rankings/top-lists")
+    public ResponseEntity<JsonNode> topLists() throws IOException {
+        return repository.readJson("rankings", "top_lists.json")
+                .map(ResponseEntity::ok)
+                .orElseGet(MarketController::notFound);
+    }
+
+    @GetMapping("/rankings/groups")
+    public ResponseEntity<JsonNode> groupMovers() throws IOException {
+        return repository.readJson("rankings", "groups.json")
+                .map(ResponseEntity::ok)
+                .orElseGet(MarketController::notFound);
+    }
+
+    @GetMapping("/rankings/rank")
+    public ResponseEntity<JsonNode> symbolRank(@RequestParam String symbol) throws IOException {
+        return loadSymbolResource(symbol, "ranks.json");
+    }
+
     @GetMapping("/dictionary")
     public ResponseEntity<JsonNode> dictionary() throws IOException {
         return repository.readJson("dictionary.json")
@@ -69,20 +94,56 @@ public class MarketController {
     public ResponseEntity<JsonNode> symbols(@RequestParam(required = false) String query,
                                             @RequestParam(required = false) String exchange,
                                             @RequestParam(required = false, defaultValue = "20") Integer limit) throws IOException {
-        return repository.readJson("symbols", "index.json")
-                .map(node -> filterSymbols(node, query, exchange, limit))
-                .map(ResponseEntity::ok)
-                .orElseGet(MarketController::notFound);
+        Optional<JsonNode> index = repository.readJsonCached("symbols", "index.json");
+        if (index.isEmpty()) {
+            return notFound();
+        }
+        if (query != null && !query.isBlank()) {
+            Optional<JsonNode> searchIndex = repository.readJsonCached("symbols", "search_index.json");
+            if (searchIndex.isPresent() && searchIndex.get().path("size").asInt(-1) == index.get().size()) {
+                List<Integer> ids = SymbolSearch.search(searchIndex.get(), query);
+                return ResponseEntity.ok(selectSymbols(index.get(), ids, exchange, limit));
+            }
+        }
+        return ResponseEntity.ok(filterSymbols(index.get(), query, exchange, limit));
     }
 
     @GetMapping("/ohlcv")
-    public ResponseEntity<JsonNode> ohlcv(@RequestParam String symbol) throws IOException {
-        return loadSymbolResource(symbol, "ohlcv.json");
+    public ResponseEntity<JsonNode> ohlcv(@RequestParam String symbol,
+                                          @RequestParam(name = "tf", required = false, defaultValue = DAILY_TIMEFRAME) String timeframe,
+                                          @RequestParam(required = false) String range) throws IOException {
+        if (range != null && !range.isBlank()) {
+            String normalizedRange = range.trim().toUpperCase(Locale.ROOT);
+            if (!CHART_RANGES.contains(normalizedRange)) {
+                return badRequest();
+            }
+            return loadSymbolResource(symbol, "ranges", normalizedRange + ".json");
+        }
+        String fileName = timeframeFile("ohlcv", timeframe);
+        if (fileName == null) {
+            return badRequest();
+        }
+        return loadSymbolResource(symbol, fileName);
+    }
+
+    @GetMapping("/ohlcv/ranges")
+    public ResponseEntity<JsonNode> ohlcvRanges(@RequestParam String symbol) throws IOException {
+        return loadSymbolResource(symbol, "ranges.json");
     }
 
     @GetMapping("/indicators")
-    public ResponseEntity<JsonNode> indicators(@RequestParam String symbol) throws IOException {
-        return loadSymbolResource(symbol, "indicators.json");
+    public ResponseEntity<JsonNode> indicators(@RequestParam String symbol,
+                                               @RequestParam(name = "tf", required = false, defaultValue = DAILY_TIMEFRAME) String timeframe) throws IOException {
+        String fileName = timeframeFile("indicators", timeframe);
+        if (fileName == null) {
+            return badRequest();
+        }
+        return loadSymbolResource(symbol, fileName);
+    }
+
+    @GetMapping("/indicators/series")
+    public ResponseEntity<JsonNode> indicatorSeries(@RequestParam String symbol) throws IOException {
+        return loadSymbolResource(symbol, "indicators_series.json");
     }
 
     @GetMapping("/forecast")
@@ -95,7 +156,7 @@ public class MarketController {
         return loadSymbolResource(symbol, "insights.json");
     }
 
-    private ResponseEntity<JsonNode> loadSymbolResource(String symbol, String fileName) throws IOException {
+    private ResponseEntity<JsonNode> loadSymbolResource(String symbol, String... fileSegments) throws IOException {
         String normalizedSymbol = normalizeSymbol(symbol);
         if (normalizedSymbol == null) {
             return badRequest();
@@ -105,25 +166,54 @@ public class MarketController {
             return badRequest();
         }
         String safeSymbol = symbolPath.toString();
-        return repository.readJson("symbols", safeSymbol, fileName)
+        String[] segments = new String[fileSegments.length + 2];
+        segments[0] = "symbols";
+        segments[1] = safeSymbol;
+        System.arraycopy(fileSegments, 0, segments, 2, fileSegments.length);
+        return repository.readJson(segments)
                 .map(ResponseEntity::ok)
                 .orElseGet(MarketController::notFound);
     }
 
+    private JsonNode selectSymbols(JsonNode node, List<Integer> ids, String exchange, Integer limit) {
+        String normalizedExchange = exchange == null ? "" : exchange.trim().toLowerCase(Locale.ROOT);
+        ArrayNode result = objectMapper.createArrayNode();
+        for (Integer id : ids) {
+            if (limit != null && limit > 0 && result.size() >= limit) {
+                break;
+            }
+            JsonNode item = node.get(id);
+            if (item == null) {
+                continue;
+            }
+            if (!normalizedExchange.isEmpty()
+                    && !item.path("exchange").asText("").toLowerCase(Locale.ROOT).contains(normalizedExchange)) {
+                continue;
+            }
+            result.add(item);
+        }
+        return result;
+    }
+
     private JsonNode filterSymbols(JsonNode node, String query, String exchange, Integer limit) {
         if (!node.isArray()) {
             return node;
         }
-        String normalizedQuery = query == null ? "" : query.trim().toLowerCase(Locale.ROOT);
+        // Same folding and fields as search_index.json, so a missing or stale index changes speed, not results.
+        String normalizedQuery = query == null ? "" : SymbolSearch.normalize(query.trim());
         String normalizedExchange = exchange == null ? "" : exchange.trim().toLowerCase(Locale.ROOT);
 
         ArrayNode result = objectMapper.createArrayNode();
         for (JsonNode item : node) {
             boolean matches = true;
             if (!normalizedQuery.isEmpty()) {
-                String symbol = item.path("symbol").asText("").toLowerCase(Locale.ROOT);
-                String name = item.path("name").asText("").toLowerCase(Locale.ROOT);
-                matches = symbol.contains(normalizedQuery) || name.contains(normalizedQuery);
+                matches = false;
+                for (String field : SymbolSearch.FIELDS) {
+                    if (SymbolSearch.normalize(item.path(field).asText("")).contains(normalizedQuery)) {
+                        matches = true;
+                        break;
+                    }
+                }
             }
             if (matches && !normalizedExchange.isEmpty()) {
                 String exch = item.path("exchange").asText("").toLowerCase(Locale.ROOT);
@@ -143,6 +233,17 @@ public class MarketController {
         return result;
     }
 
+    private static String timeframeFile(String baseName, String timeframe) {
+        String normalized = timeframe == null ? DAILY_TIMEFRAME : timeframe.trim().toLowerCase(Locale.ROOT);
+        if (DAILY_TIMEFRAME.equals(normalized)) {
+            return baseName + ".json";
+        }
+        if (!DERIVED_TIMEFRAMES.contains(normalized)) {
+            return null;
+        }
+        return baseName + "_" + normalized + ".json";
+    }
+
     private String normalizeSymbol(String symbol) {
         if (symbol == null) {
             return null;
@@ -0,0 +1,104 @@
+package com.tickervista.api;
+
+import com.fasterxml.jackson.databind.JsonNode;
+
+import java.text.Normalizer;
+import java.util.ArrayList;
+import java.util.Comparator;
+import java.util.List;
+import java.util.Locale;
+
+/**
+ * Lookups against {@code symbols/search_index.json} as built by the worker's {@code build_search_index}.
+ * A query matches when the normalized symbol, name or sector contains it. Queries of three characters
+ * or more walk the shortest trigram posting list, binary-search the others and confirm candidates
+ * against the indexed text, so their cost depends on the number of matches. Shorter queries scan the
+ * indexed texts: they match a large share of the universe anyway.
+ */
+final class SymbolSearch {
+
+    /** The symbols/index.json fields the worker indexes, in the order they appear in {@code texts}. */
+    static final List<String> FIELDS = List.of("symbol", "name", "sector");
+
+    private SymbolSearch() {
+    }
+
+    /** Mirrors {@code normalize_search_text} in the worker: NFKC, lower case, hiragana folded to katakana. */
+    static String normalize(String text) {
+        String folded = Normalizer.normalize(text, Normalizer.Form.NFKC).toLowerCase(Locale.ROOT);
+        StringBuilder builder = new StringBuilder(folded.length());
+        for (int i = 0; i < folded.length(); i += 1) {
+            char c = folded.charAt(i);
+            builder.append(c >= 'ぁ' && c <= 'ゖ' ? (char) (c + 0x60) : c);
+        }
+        return builder.toString();
+    }
+
+    /** Entry ids (positions in {@code symbols/index.json}) matching the query, ascending. */
+    static List<Integer> search(JsonNode index, String query) {
+        String needle = normalize(query.trim());
+        if (needle.indexOf('\n') >= 0) {
+            return new ArrayList<>();
+        }
+        if (needle.codePointCount(0, needle.length()) < 3) {
+            return scanTexts(index, needle);
+        }
+        return trigramSearch(index, needle);
+    }
+
+    private static List<Integer> scanTexts(JsonNode index, String needle) {
+        JsonNode texts = index.path("texts");
+        List<Integer> result = new ArrayList<>();
+        for (int id = 0; id < texts.size(); id += 1) {
+            if (texts.get(id).asText("").contains(needle)) {
+                result.add(id);
+            }
+        }
+        return result;
+    }
+
+    private static List<Integer> trigramSearch(JsonNode index, String needle) {
+        JsonNode trigrams = index.path("trigrams");
+        int[] codePoints = needle.codePoints().toArray();
+        List<JsonNode> postings = new ArrayList<>();
+        for (int i = 0; i + 3 <= codePoints.length; i += 1) {
+            JsonNode posting = trigrams.get(new String(codePoints, i, 3));
+            if (posting == null || posting.isEmpty()) {
+                return new ArrayList<>();
+            }
+            postings.add(posting);
+        }
+        postings.sort(Comparator.comparingInt(JsonNode::size));
+        JsonNode texts = index.path("texts");
+        List<Integer> result = new ArrayList<>();
+        for (JsonNode candidate : postings.get(0)) {
+            int id = candidate.asInt();
+            boolean inAll = true;
+            for (int i = 1; i < postings.size() && inAll; i += 1) {
+                inAll = containsSorted(postings.get(i), id);
+            }
+            if (inAll && texts.path(id).asText("").contains(needle)) {
+                result.add(id);
+            }
+        }
+        return result;
+    }
+
+    private static boolean containsSorted(JsonNode posting, int id) {
+        int low = 0;
+        int high = posting.size() - 1;
+        while (low <= high) {
+            int mid = (low + high) >>> 1;
+            int value = posting.get(mid).asInt();
+            if (value == id) {
+                return true;
+            }
+            if (value < id) {
+                low = mid + 1;
+            } else {
+                high = mid - 1;
+            }
+        }
+        return false;
+    }
+}
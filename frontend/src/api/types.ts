@@ -25,9 +25,29 @@ export interface OhlcvSeriesResponse {
   symbol: string;
   timeframe: string;
   tz: string;
+  source?: 'stooq' | 'yfinance' | 'synthetic';
+  range?: string;
+  downsampled?: boolean;
   candles: OhlcvPointDto[];
 }
 
+export interface OhlcvRangeEntry {
+  range: string;
+  timeframe: string;
+  bars: number;
+  points: number;
+  downsampled: boolean;
+  from: string;
+  to: string;
+}
+
+export interface OhlcvRangeManifest {
+  symbol: string;
+  maxPoints: number;
+  downsample: 'minmax' | 'lttb' | 'none';
+  ranges: OhlcvRangeEntry[];
+}
+
 export interface IndicatorsResponseDto {
   symbol: string;
   timeframe: string;
@@ -48,6 +68,23 @@ export interface IndicatorsResponseDto {
   };
 }
 
+export interface IndicatorSeriesResponse {
+  symbol: string;
+  timeframe: string;
+  ts: string[];
+  sma20: number[];
+  sma50: number[];
+  bbUpper: number[];
+  bbMiddle: number[];
+  bbLower: number[];
+  rsi14: number[];
+  ema12: number[];
+  ema26: number[];
+  macd: number[];
+  signal: number[];
+  histogram: number[];
+}
+
 export interface InsightSummaryResponse {
   symbol: string;
   trafficLight: string;
@@ -64,12 +101,15 @@ export interface ForecastBand {
   mid: number;
   lower: number;
   upper: number;
+  p25?: number;
+  p75?: number;
 }
 
 export interface ForecastResponseDto {
   symbol: string;
   model: string;
   horizonDays: number;
+  paths?: number;
   bands: ForecastBand[];
   methodology: string;
 }
@@ -80,4 +120,4 @@ export interface TooltipEntry {
   description: string;
   how_to_read: string;
   category: string;
-}
+}
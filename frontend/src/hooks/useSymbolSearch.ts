@@ -3,6 +3,13 @@ import type { SymbolDto } from "../api/types";
 import { fetchJSON } from "../lib/apiClient";
 import { samples } from "../data/samples";
 
+// Same folding as the worker's search index: NFKC, lower case, hiragana -> katakana.
+const normalizeSearchText = (text: string) =>
+  text
+    .normalize("NFKC")
+    .toLowerCase()
+    .replace(/[\u3041-\u3096]/g, (char) => String.fromCharCode(char.charCodeAt(0) + 0x60));
+
 export const useSymbolSearch = (query: string, exchangeFilter?: string) => {
   return useQuery<SymbolDto[]>({
     queryKey: ["symbol-search", query, exchangeFilter],
@@ -15,13 +22,12 @@ export const useSymbolSearch = (query: string, exchangeFilter?: string) => {
         },
         fallback: () => samples.symbolIndex as SymbolDto[]
       });
-      const normalized = query.trim().toLowerCase();
+      const normalized = normalizeSearchText(query.trim());
       return res.data
         .filter((item) => {
           if (!normalized) return true;
-          return (
-            item.symbol.toLowerCase().includes(normalized) ||
-            item.name.toLowerCase().includes(normalized)
+          return [item.symbol, item.name, item.sector].some((field) =>
+            normalizeSearchText(field ?? "").includes(normalized)
           );
         })
         .slice(0, 20);
@@ -49,11 +49,19 @@ const mapStaticEndpoint = (path: string, params?: QueryParams) => {
     return null;
   }
   const symbol = params?.symbol;
+  const timeframe = params?.tf && params.tf !== "1d" ? `_${params.tf}` : "";
   switch (path) {
     case "/api/v1/ohlcv":
-      return symbol ? `${base}/symbols/${symbol}/ohlcv.json` : null;
+      if (symbol && params?.range) {
+        return `${base}/symbols/${symbol}/ranges/${params.range}.json`;
+      }
+      return symbol ? `${base}/symbols/${symbol}/ohlcv${timeframe}.json` : null;
+    case "/api/v1/ohlcv/ranges":
+      return symbol ? `${base}/symbols/${symbol}/ranges.json` : null;
     case "/api/v1/indicators":
-      return symbol ? `${base}/symbols/${symbol}/indicators.json` : null;
+      return symbol ? `${base}/symbols/${symbol}/indicators${timeframe}.json` : null;
+    case "/api/v1/indicators/series":
+      return symbol ? `${base}/symbols/${symbol}/indicators_series.json` : null;
     case "/api/v1/forecast":
       return symbol ? `${base}/symbols/${symbol}/forecast.json` : null;
     case "/api/v1/insights/summary":
@@ -70,6 +78,12 @@ const mapStaticEndpoint = (path: string, params?: QueryParams) => {
       return `${base}/rankings/top_lists.json`;
     case "/api/v1/rankings/dividends":
       return `${base}/rankings/top_lists.json`;
+    case "/api/v1/rankings/top-lists":
+      return `${base}/rankings/top_lists.json`;
+    case "/api/v1/rankings/groups":
+      return `${base}/rankings/groups.json`;
+    case "/api/v1/rankings/rank":
+      return symbol ? `${base}/symbols/${symbol}/ranks.json` : null;
     default:
       return `${base}${path}`;
   }
@@ -0,0 +1,249 @@
+"""
+Offline benchmark for the worker's hot paths.
+
+Builds a synthetic universe with `generate_synthetic_candles`, times each stage on its own and a full
+`main()` run with `fetch_csv` stubbed out, and optionally saves or compares a JSON baseline:
+
+    python worker/bench_worker.py --symbols 500 --days 2500 --save .benchmarks/baseline.json
+    python worker/bench_worker.py --symbols 500 --days 2500 --compare .benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+import fetch_market_data as fm
+
+SECTORS = sorted({meta.sector for meta in fm.BASE_UNIVERSE})
+
+
+def synthetic_universe(count: int) -> List[fm.SymbolMeta]:
+    """Deterministic universe of `count` symbols spread over the sectors used by BASE_UNIVERSE."""
+    metas = []
+    for idx in range(count):
+        template = fm.BASE_UNIVERSE[idx % len(fm.BASE_UNIVERSE)]
+        symbol = f"SYN{idx:05d}"
+        metas.append(
+            fm.SymbolMeta(
+                symbol=symbol,
+                stooq=f"{symbol.lower()}.us",
+                name=f"Synthetic {idx}",
+                exchange=template.exchange,
+                currency=template.currency,
+                tz=template.tz,
+                sector=SECTORS[idx % len(SECTORS)],
+                country=template.country,
+                dividend_yield=template.dividend_yield,
+            )
+        )
+    return metas
+
+
+def candles_to_csv(candles: List[Dict[str, Any]]) -> str:
+    """Render candles in the Stooq daily CSV layout so parse_csv sees realistic input."""
+    lines = ["Date,Open,High,Low,Close,Volume"]
+    for candle in candles:
+        lines.append(
+            f"{candle['ts'][:10]},{candle['open']},{candle['high']},{candle['low']},{candle['close']},{candle['volume']}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def measure(name: str, func: Callable[[Any], Any], items: Sequence[Any], repeat: int = 1) -> Dict[str, Any]:
+    """
+    Time `func` once per item (`repeat` times) and then replay one pass under tracemalloc for the
+    peak allocation, so the memory tracing does not distort the latency figures.
+    """
+    durations: List[float] = []
+    for _ in range(repeat):
+        for item in items:
+            started = time.perf_counter()
+            func(item)
+            durations.append(time.perf_counter() - started)
+    tracemalloc.start()
+    for item in items:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    samples = np.array(durations)
+    total = float(samples.sum())
+    return {
+        "stage": name,
+        "calls": len(durations),
+        "totalSeconds": total,
+        "throughputPerSecond": len(durations) / total if total else float("inf"),
+        "p50Ms": float(np.percentile(samples, 50) * 1000),
+        "p99Ms": float(np.percentile(samples, 99) * 1000),
+        "peakKiB": peak / 1024,
+    }
+
+
+def run_end_to_end(
+    metas: List[fm.SymbolMeta], csv_by_code: Dict[str, str], workdir: Path, workers: int, jobs: int
+) -> Dict[str, Any]:
+    """Run main() against a temporary data directory with fetch_csv and Alpha Vantage stubbed."""
+    universe_path = workdir / "universe.json"
+    universe_path.write_text(json.dumps([asdict(meta) for meta in metas]), encoding="utf-8")
+    fallback_csv = next(iter(csv_by_code.values()))
+    originals = (fm.fetch_csv, fm.fetch_alpha_overview, fm.DATA_DIR, fm.SAMPLES_DIR)
+    fm.fetch_csv = lambda code, since=None: csv_by_code.get(code, fallback_csv)
+    fm.fetch_alpha_overview = lambda symbol: None
+    fm.DATA_DIR = workdir / "data"
+    fm.SAMPLES_DIR = workdir / "samples"
+    try:
+        started = time.perf_counter()
+        fm.main(["--universe", str(universe_path), "--workers", str(workers), "--jobs", str(jobs), "--no-http-cache"])
+        elapsed = time.perf_counter() - started
+    finally:
+        fm.fetch_csv, fm.fetch_alpha_overview, fm.DATA_DIR, fm.SAMPLES_DIR = originals
+    return {
+        "stage": "end_to_end",
+        "calls": 1,
+        "totalSeconds": elapsed,
+        "throughputPerSecond": len(metas) / elapsed,
+        "p50Ms": elapsed * 1000,
+        "p99Ms": elapsed * 1000,
+        "peakKiB": None,
+    }
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    metas = synthetic_universe(args.symbols)
+    candle_lists = [fm.generate_synthetic_candles(meta, days=args.days) for meta in metas]
+    csv_texts = [candles_to_csv(candles) for candles in candle_lists]
+    snapshots = fm.batch_snapshots(metas, candle_lists)
+    symbols_index = fm.build_symbols_index(snapshots)
+    search_index = fm.build_search_index(symbols_index)
+    queries = [meta.symbol[-size:] for meta in metas[:200] for size in (2, 3, 5)]
+    stages = [
+        measure("parse_csv", lambda text: fm.parse_csv(text, None), csv_texts),
+        measure("parse_csv_columns", fm.parse_csv_columns, csv_texts),
+        measure("compute_indicators", fm.compute_indicators, candle_lists),
+        measure("compute_forecast", lambda candles: fm.compute_forecast("BENCH", candles), candle_lists),
+        measure(
+            "monte_carlo_forecast",
+            lambda candles: fm.monte_carlo_forecast("BENCH", candles, "gbm", args.mc_paths),
+            candle_lists,
+        ),
+        measure(
+            "universe_analytics",
+            lambda lists: fm.universe_analytics(*fm.stack_candles(lists)),
+            [candle_lists],
+            repeat=args.repeat,
+        ),
+        measure(
+            "build_rankings",
+            lambda snaps: fm.build_rankings(fm.RankingColumns.from_snapshots(snaps)),
+            [snapshots],
+            repeat=args.repeat,
+        ),
+        measure("build_sector_overview", fm.build_sector_overview, [snapshots], repeat=args.repeat),
+        measure("build_search_index", fm.build_search_index, [symbols_index], repeat=args.repeat),
+        measure("search_symbols", lambda query: fm.search_symbols(search_index, query), queries),
+    ]
+    with tempfile.TemporaryDirectory(prefix="tickervista-bench-") as tmp:
+        workdir = Path(tmp)
+        payloads = [
+            (workdir / "write" / f"{meta.symbol}.json", {"symbol": meta.symbol, "candles": candles})
+            for meta, candles in zip(metas, candle_lists)
+        ]
+        stages.append(measure("write_json", lambda item: fm.write_json(*item), payloads))
+        if not args.skip_end_to_end:
+            csv_by_code = {meta.stooq: text for meta, text in zip(metas, csv_texts)}
+            stages.append(run_end_to_end(metas, csv_by_code, workdir, args.workers, args.jobs))
+    return {
+        "meta": {
+            "symbols": args.symbols,
+            "days": args.days,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "stages": {stage["stage"]: stage for stage in stages},
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=fm.ROOT
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    meta = report["meta"]
+    print(f"symbols={meta['symbols']} days={meta['days']} commit={meta['commit']}")
+    print(f"{'stage':<22}{'calls':>7}{'total s':>10}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>11}")
+    for stage in report["stages"].values():
+        peak = f"{stage['peakKiB']:.0f}" if stage["peakKiB"] is not None else "-"
+        print(
+            f"{stage['stage']:<22}{stage['calls']:>7}{stage['totalSeconds']:>10.3f}"
+            f"{stage['throughputPerSecond']:>12.1f}{stage['p50Ms']:>10.3f}{stage['p99Ms']:>10.3f}{peak:>11}"
+        )
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return the stages whose p50 latency grew by more than `threshold` over the baseline."""
+    regressions = []
+    print(f"\nvs baseline {baseline['meta'].get('commit')} (symbols={baseline['meta'].get('symbols')})")
+    for name, stage in report["stages"].items():
+        previous = baseline["stages"].get(name)
+        if not previous or not previous["p50Ms"]:
+            continue
+        ratio = stage["p50Ms"] / previous["p50Ms"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        print(f"{name:<22}{previous['p50Ms']:>10.3f} -> {stage['p50Ms']:>10.3f} ms  x{ratio:.2f} {flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="tickervista-bench", description="Benchmark the TickerVista worker offline.")
+    parser.add_argument("--symbols", type=int, default=200, help="synthetic universe size (default: %(default)s)")
+    parser.add_argument("--days", type=int, default=730, help="bars per symbol (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions for universe-wide stages")
+    parser.add_argument("--mc-paths", type=int, default=fm.MC_PATHS, help="paths for the Monte Carlo stage")
+    parser.add_argument("--workers", type=int, default=fm.DEFAULT_WORKERS, help="--workers for the end-to-end run")
+    parser.add_argument("--jobs", type=int, default=1, help="--jobs for the end-to-end run")
+    parser.add_argument("--skip-end-to-end", action="store_true", help="only time the individual stages")
+    parser.add_argument("--save", type=Path, help="write the report as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="compare p50 latencies against a saved baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2, help="p50 ratio counted as a regression (default: %(default)s)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = run_benchmarks(args)
+    print_report(report)
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare_reports(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
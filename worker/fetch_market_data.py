@@ -1,26 +1,88 @@
 from __future__ import annotations
 
+import argparse
+import bisect
 import csv
+import gzip
+import hashlib
+import heapq
+import io
 import json
 import math
+import multiprocessing
 import os
 import random
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+import shutil
+import threading
+import time
+import unicodedata
+import warnings
+from array import array
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 import requests
-import yfinance as yf
+from numpy.lib.stride_tricks import sliding_window_view
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli
+except ImportError:  # optional: only needed for --precompress br
+    brotli = None
 
 ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT / "data"
 SAMPLES_DIR = ROOT / "frontend" / "src" / "data" / "samples"
+# Where the API-facing JSON goes: DATA_DIR itself, or a generation directory under it (--generations).
+PUBLISH_DIR = DATA_DIR
 ALPHA_KEY = os.getenv("ALPHA_VANTAGE_KEY")
 TODAY = datetime.now(timezone.utc)
+DEFAULT_WORKERS = 8
+HISTORY_DAYS = 730
+# Daily bars kept in the candle store (~10 years) so the derived timeframes can cover long ranges.
+STORE_HISTORY_DAYS = 2520
+# Timeframes resampled from the daily store and how many of their bars are published (~10Y / ~20Y).
+TIMEFRAMES: Dict[str, int] = {"1w": 520, "1mo": 240}
+# Chart ranges precomputed per symbol: calendar days (as in the dashboard) and the timeframe sliced.
+CHART_RANGES: Dict[str, Tuple[int, str]] = {
+    "1M": (30, "1d"),
+    "3M": (90, "1d"),
+    "6M": (180, "1d"),
+    "1Y": (365, "1d"),
+    "2Y": (730, "1d"),
+    "5Y": (1826, "1w"),
+    "10Y": (3652, "1w"),
+}
+RANGE_MAX_POINTS = 300
+DOWNSAMPLE = "minmax"
+# forecast.json model: the deterministic "cone", or a "gbm" / "bootstrap" Monte Carlo with MC_PATHS paths.
+FORECAST_MODEL = "cone"
+MC_PATHS = 2000
+# Tickers per multi-ticker yfinance download when Stooq fails for a batch of symbols.
+YFINANCE_BATCH = 50
+INCREMENTAL_SOURCES = {"stooq", "yfinance"}
+PRECOMPRESS: Tuple[str, ...] = ()
 _NULLISH_STRINGS = {"none", "null", "na", "n/a", "nan"}
 
 
+def _env_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
 def safe_float(value: Any, default: float = 0.0) -> float:
     """
     Convert loosely formatted numeric strings into floats.
@@ -90,16 +152,389 @@ BASE_UNIVERSE: List[SymbolMeta] = [
 ]
 
 
-def load_sp500_universe(existing_symbols: set[str], limit: int = 200) -> List[SymbolMeta]:
-    url = "https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv"
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-    except requests.RequestException as exc:
-        print(f"[warn] failed to load S&P 500 universe: {exc}")
-        return []
+class RunMetrics:
+    """
+    Thread-safe stage timers and counters. Counters take at most one label, e.g. host="stooq.com".
+    Instances pickle without their lock so analytics workers can ship them back to the parent.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, List[float]] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.symbol_sources: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {key: value for key, value in self.__dict__.items() if key != "_lock"}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry = self.stages.setdefault(stage, [0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def record_source(self, symbol: str, source: str) -> None:
+        self.add("symbols", source=source)
+        with self._lock:
+            self.symbol_sources[symbol] = source
+
+    def merge(self, other: RunMetrics) -> None:
+        with self._lock:
+            for stage, (count, seconds) in other.stages.items():
+                entry = self.stages.setdefault(stage, [0, 0.0])
+                entry[0] += count
+                entry[1] += seconds
+            for key, value in other.counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            self.symbol_sources.update(other.symbol_sources)
+
+    def to_dict(self) -> Dict[str, Any]:
+        counters: Dict[str, Any] = {}
+        for (name, labels), value in sorted(self.counters.items()):
+            if labels:
+                counters.setdefault(name, {})[labels[0][1]] = value
+            else:
+                counters[name] = value
+        return {
+            "stages": {stage: {"count": count, "seconds": seconds} for stage, (count, seconds) in sorted(self.stages.items())},
+            "counters": counters,
+            "symbolSources": dict(sorted(self.symbol_sources.items())),
+        }
+
+    def to_prometheus(self, prefix: str = "tickervista") -> str:
+        lines = [
+            f"# TYPE {prefix}_stage_seconds_total counter",
+            *(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {seconds:.6f}' for stage, (_, seconds) in sorted(self.stages.items())),
+            f"# TYPE {prefix}_stage_calls_total counter",
+            *(f'{prefix}_stage_calls_total{{stage="{stage}"}} {count}' for stage, (count, _) in sorted(self.stages.items())),
+        ]
+        declared = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = f"{prefix}_{_snake_case(name)}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            label_text = ",".join(f'{key}="{val}"' for key, val in labels)
+            lines.append(f"{metric}{{{label_text}}} {value:.12g}" if label_text else f"{metric} {value:.12g}")
+        return "\n".join(lines) + "\n"
+
+
+def _snake_case(name: str) -> str:
+    return "".join(f"_{char.lower()}" if char.isupper() else char for char in name)
+
+
+RUN_METRICS = RunMetrics()
+_metrics_local = threading.local()
+
+
+def metrics() -> RunMetrics:
+    """Collector for the current thread: an analytics task's own instance, else the run-wide one."""
+    return getattr(_metrics_local, "collector", None) or RUN_METRICS
+
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every worker hitting the same host.
+    `daily_quota` caps the requests granted per UTC day. With a QuotaLedger attached, `used` also
+    counts what earlier runs and other processes were granted today (see QuotaLedger).
+    """
+
+    def __init__(self, rate: float, burst: int = 1, daily_quota: Optional[int] = None, name: str = "") -> None:
+        self.name = name
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.daily_quota = daily_quota
+        self.day = _utc_day()
+        self.used = 0
+        self.persisted = 0
+        self.ledger: Optional[QuotaLedger] = None
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _roll_day(self) -> None:
+        today = _utc_day()
+        if today != self.day:
+            self.day, self.used, self.persisted = today, 0, 0
+
+    def acquire(self) -> bool:
+        """Block until a token is available; return False once the quota is spent."""
+        while True:
+            with self._lock:
+                self._roll_day()
+                if self.daily_quota is not None and self.used >= self.daily_quota:
+                    metrics().add("quotaExhausted", host=self.name)
+                    return False
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                granted = self._tokens >= 1
+                if granted:
+                    self._tokens -= 1
+                    self.used += 1
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            if granted:
+                if self.ledger is not None:
+                    self.ledger.save()
+                return True
+            metrics().add("rateLimitWaits", host=self.name)
+            metrics().add("rateLimitWaitSeconds", wait, host=self.name)
+            time.sleep(wait)
+
+    def sync(self, day: str, stored: int) -> int:
+        """
+        Fold in `stored`, the count persisted for `day`: whatever it gained since this limiter last
+        synced was granted to other processes. Returns today's merged count to persist.
+        """
+        with self._lock:
+            self._roll_day()
+            if day == self.day:
+                self.used += max(0, stored - self.persisted)
+            self.persisted = self.used
+            return self.used
+
+
+RATE_LIMITS: Dict[str, RateLimiter] = {
+    "stooq.com": RateLimiter(rate=4.0, burst=4, daily_quota=_env_int("STOOQ_DAILY_QUOTA"), name="stooq.com"),
+    "yahoo": RateLimiter(rate=2.0, burst=2, daily_quota=_env_int("YAHOO_DAILY_QUOTA"), name="yahoo"),
+    "alphavantage.co": RateLimiter(
+        rate=5 / 60, burst=1, daily_quota=_env_int("ALPHA_VANTAGE_DAILY_QUOTA", 25), name="alphavantage.co"
+    ),
+}
+
+
+# Quota usage is written at most this often while requests are granted, and once more at the end of a run.
+QUOTA_SAVE_INTERVAL = 2.0
+
+
+def quota_path() -> Path:
+    return DATA_DIR / "quota.json"
+
+
+class QuotaLedger:
+    """
+    Requests granted per host on the current UTC day, persisted in data/quota.json so daily quotas
+    hold across incremental reruns, resumed runs and shards running side by side. Every save merges
+    the counts other processes wrote since into the limiters before writing them back.
+    """
+
+    def __init__(self, path: Path, limiters: Dict[str, RateLimiter]) -> None:
+        self.path = path
+        self.limiters = limiters
+        self._lock = threading.Lock()
+        self._saved = 0.0
+
+    def attach(self) -> None:
+        """Seed the limiters with today's persisted usage and have them save through this ledger."""
+        for limiter in self.limiters.values():
+            limiter.ledger = self
+        self.save(force=True)
+
+    def save(self, force: bool = False) -> None:
+        with self._lock:
+            if not force and time.monotonic() - self._saved < QUOTA_SAVE_INTERVAL:
+                return
+            try:
+                payload = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                payload = {}
+            day = payload.get("date", "")
+            stored = payload.get("hosts") or {}
+            hosts = {name: limiter.sync(day, int(stored.get(name, 0))) for name, limiter in self.limiters.items()}
+            payload = {"version": 1, "date": _utc_day(), "hosts": hosts}
+            _write_atomic(self.path, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+            self._saved = time.monotonic()
+
+
+HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    raise_on_status=False,
+)
+HTTP_CACHE_TTLS: Dict[str, timedelta] = {
+    "stooq": timedelta(hours=12),
+    "sp500": timedelta(days=1),
+}
+# Alpha Vantage OVERVIEW values are cached in the fundamentals store and re-requested after this long.
+FUNDAMENTALS_MAX_AGE = timedelta(days=7)
+HTTP_CACHE_ENABLED = True
+_UNCACHED_PARAMS = {"apikey"}
+_thread_local = threading.local()
+
+
+def http_session() -> requests.Session:
+    """Keep-alive session with retry/backoff, one per worker thread."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=HTTP_RETRY)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _thread_local.session = session
+    return session
+
+
+@dataclass
+class HttpResult:
+    url: str
+    status_code: int
+    content: bytes
+    from_cache: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error for url: {self.url}")
+
+
+def http_cache_dir() -> Path:
+    return DATA_DIR / "cache" / "http"
+
+
+def _cache_key(url: str, params: Optional[Dict[str, str]]) -> str:
+    visible = sorted((key, value) for key, value in (params or {}).items() if key not in _UNCACHED_PARAMS)
+    return hashlib.sha256(json.dumps([url, visible]).encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def http_get(
+    url: str,
+    params: Optional[Dict[str, str]] = None,
+    source: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    cache_if: Optional[Callable[[bytes], bool]] = None,
+) -> Optional[HttpResult]:
+    """
+    GET through the pooled session and the on-disk response cache.
+    Entries younger than HTTP_CACHE_TTLS[source] are served without touching the network; stale
+    ones are revalidated with ETag / If-Modified-Since. Bodies are stored under their SHA-256 so
+    identical payloads share one blob. Returns None when `limiter` has no quota left.
+    """
+    ttl = HTTP_CACHE_TTLS.get(source or "")
+    cache_root = http_cache_dir()
+    entry_path = cache_root / "entries" / f"{_cache_key(url, params)}.json"
+    entry: Optional[Dict[str, Any]] = None
+    cached_body: Optional[bytes] = None
+    if HTTP_CACHE_ENABLED and ttl is not None and entry_path.exists():
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+            cached_body = (cache_root / "blobs" / entry["body"]).read_bytes()
+        except (OSError, ValueError, KeyError):
+            entry = None
+        if entry is not None and time.time() - entry.get("fetchedAt", 0) < ttl.total_seconds():
+            metrics().add("cacheHits", source=source or "")
+            return HttpResult(url, entry.get("status", 200), cached_body, from_cache=True)
+
+    if limiter is not None and not limiter.acquire():
+        return None
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("lastModified"):
+            headers["If-Modified-Since"] = entry["lastModified"]
+    response = http_session().get(url, params=params, headers=headers, timeout=30)
+    retries = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+    metrics().add("httpRequests", source=source or "")
+    metrics().add("httpRetries", len(retries), source=source or "")
+    metrics().add("bytesDownloaded", len(response.content), source=source or "")
+
+    if response.status_code == 304 and entry is not None and cached_body is not None:
+        entry["fetchedAt"] = time.time()
+        _write_atomic(entry_path, json.dumps(entry).encode("utf-8"))
+        metrics().add("cacheRevalidated", source=source or "")
+        return HttpResult(url, entry.get("status", 200), cached_body, from_cache=True)
+
+    result = HttpResult(url, response.status_code, response.content)
+    if HTTP_CACHE_ENABLED and ttl is not None and response.status_code == 200 and (cache_if is None or cache_if(response.content)):
+        digest = hashlib.sha256(response.content).hexdigest()
+        _write_atomic(cache_root / "blobs" / digest, response.content)
+        entry = {
+            "url": url,
+            "source": source,
+            "status": response.status_code,
+            "body": digest,
+            "etag": response.headers.get("ETag"),
+            "lastModified": response.headers.get("Last-Modified"),
+            "fetchedAt": time.time(),
+        }
+        _write_atomic(entry_path, json.dumps(entry).encode("utf-8"))
+    return result
+
+
+def prune_http_cache() -> Tuple[int, int]:
+    """
+    Drop cache entries older than their source's TTL, then delete the blobs no entry references.
+    Entries written before the source was recorded get the longest TTL. Blobs from the last minute
+    are kept because a concurrent run writes the blob before its entry. Returns (entries, blobs) removed.
+    """
+    cache_root = http_cache_dir()
+    now = time.time()
+    longest = max(ttl.total_seconds() for ttl in HTTP_CACHE_TTLS.values())
+    referenced = set()
+    entries = blobs = 0
+    for entry_path in (cache_root / "entries").glob("*.json"):
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entry = {}
+        if "source" in entry:
+            ttl = HTTP_CACHE_TTLS.get(entry["source"] or "")
+            max_age = ttl.total_seconds() if ttl is not None else 0.0
+        else:
+            max_age = longest
+        if now - entry.get("fetchedAt", 0) < max_age:
+            referenced.add(entry.get("body"))
+            continue
+        entry_path.unlink(missing_ok=True)
+        entries += 1
+    for blob in (cache_root / "blobs").glob("*"):
+        try:
+            recent = now - blob.stat().st_mtime < 60
+        except OSError:
+            continue
+        if blob.name not in referenced and not recent:
+            blob.unlink(missing_ok=True)
+            blobs += 1
+    return entries, blobs
+
 
-    reader = csv.DictReader(response.text.splitlines())
+def parse_sp500_constituents(csv_text: str, existing_symbols: set[str], limit: int = 200) -> List[SymbolMeta]:
+    reader = csv.DictReader(csv_text.splitlines())
     metas: List[SymbolMeta] = []
     for row in reader:
         symbol = row.get("Symbol", "").strip().upper()
@@ -126,8 +561,71 @@ def load_sp500_universe(existing_symbols: set[str], limit: int = 200) -> List[Sy
     return metas
 
 
-UNIVERSE: List[SymbolMeta] = BASE_UNIVERSE + load_sp500_universe({meta.symbol for meta in BASE_UNIVERSE}, limit=200)
-print(f"[info] symbol universe size: {len(UNIVERSE)}")
+def load_sp500_universe(existing_symbols: set[str], limit: int = 200) -> List[SymbolMeta]:
+    url = "https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv"
+    try:
+        response = http_get(url, source="sp500")
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        print(f"[warn] failed to load S&P 500 universe: {exc}")
+        return []
+    return parse_sp500_constituents(response.text, existing_symbols, limit)
+
+
+UNIVERSE_SOURCE = os.getenv("TICKERVISTA_UNIVERSE", "remote")
+SP500_LIMIT = 200
+
+
+def universe_snapshot_path() -> Path:
+    return DATA_DIR / "universe" / "snapshot.json"
+
+
+def load_universe_file(path: Path) -> List[SymbolMeta]:
+    """
+    Read a universe from disk. JSON files hold a complete list of SymbolMeta fields; CSV files
+    use the S&P 500 constituents layout (Symbol, Name, Sector) and extend BASE_UNIVERSE.
+    """
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".json":
+        return [SymbolMeta(**row) for row in json.loads(text)]
+    return BASE_UNIVERSE + parse_sp500_constituents(text, {meta.symbol for meta in BASE_UNIVERSE}, SP500_LIMIT)
+
+
+@cache
+def get_universe(source: str = "remote") -> List[SymbolMeta]:
+    """
+    Resolve the symbol universe on first use instead of at import time.
+    `source` is "remote" (BASE_UNIVERSE plus the S&P 500 list, snapshotted to data/universe/ and
+    read back from there when the list cannot be fetched), "snapshot" (the last remote result), "base" (BASE_UNIVERSE only) or a path to a CSV/JSON file.
+    """
+    if source == "base":
+        return list(BASE_UNIVERSE)
+    if source == "snapshot":
+        path = universe_snapshot_path()
+        if path.exists():
+            return load_universe_file(path)
+        print("[warn] no universe snapshot found, loading the remote list")
+        return get_universe("remote")
+    if source == "remote":
+        sp500 = load_sp500_universe({meta.symbol for meta in BASE_UNIVERSE}, limit=SP500_LIMIT)
+        if sp500:
+            metas = BASE_UNIVERSE + sp500
+            write_json(universe_snapshot_path(), [asdict(meta) for meta in metas])
+            return metas
+        path = universe_snapshot_path()
+        if path.exists():
+            print(f"[warn] S&P 500 list unavailable, using the universe snapshot {path}")
+            return load_universe_file(path)
+        print("[warn] S&P 500 list unavailable and no universe snapshot found, using BASE_UNIVERSE only")
+        return list(BASE_UNIVERSE)
+    return load_universe_file(Path(source))
+
+
+def __getattr__(name: str) -> Any:
+    if name == "UNIVERSE":
+        return get_universe(UNIVERSE_SOURCE)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 INDEX_CONFIG = [
     ("SPX", "^spx", "S&P 500"),
@@ -143,38 +641,307 @@ FX_CONFIG = [
 ]
 
 
-def fetch_csv(symbol: str) -> str:
+def fetch_csv(symbol: str, since: Optional[date] = None) -> str:
     url = f"https://stooq.com/q/d/l/?s={symbol}&i=d"
-    response = requests.get(url, timeout=30)
+    if since is not None:
+        url += f"&d1={since:%Y%m%d}&d2={TODAY:%Y%m%d}"
+    with metrics().timer("fetch_csv"):
+        response = http_get(
+            url,
+            source="stooq",
+            limiter=RATE_LIMITS["stooq.com"],
+            cache_if=lambda body: b"Exceeded the daily hits limit" not in body,
+        )
+    if response is None:
+        raise RuntimeError("stooq_limit")
     response.raise_for_status()
     return response.text
 
 
-def parse_csv(csv_text: str, meta: SymbolMeta | None) -> List[Dict[str, Any]]:
+CANDLE_PRICE_COLUMNS = ("open", "high", "low", "close", "volume", "adjClose")
+
+
+@dataclass
+class CandleColumns:
+    """
+    Column-oriented OHLCV history. `ts` holds UTC epoch seconds (int64); every other column is float64.
+    Arrays loaded through `read_candle_store` are read-only memory maps.
+    """
+
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    adjClose: np.ndarray
+    source: str = "unknown"
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def tail(self, count: int) -> CandleColumns:
+        return CandleColumns(
+            ts=self.ts[-count:], source=self.source, **{name: getattr(self, name)[-count:] for name in CANDLE_PRICE_COLUMNS}
+        )
+
+    def take(self, index: np.ndarray) -> CandleColumns:
+        return CandleColumns(
+            ts=self.ts[index], source=self.source, **{name: getattr(self, name)[index] for name in CANDLE_PRICE_COLUMNS}
+        )
+
+    def merge(self, newer: CandleColumns) -> CandleColumns:
+        """Union of both histories ordered by ts; bars from `newer` win on duplicate timestamps."""
+        ts = np.concatenate([newer.ts, self.ts])
+        _, first = np.unique(ts, return_index=True)
+        columns = {
+            name: np.concatenate([getattr(newer, name), getattr(self, name)])[first] for name in CANDLE_PRICE_COLUMNS
+        }
+        return CandleColumns(ts=ts[first], source=newer.source, **columns)
+
+    def equals(self, other: CandleColumns) -> bool:
+        return all(np.array_equal(getattr(self, name), getattr(other, name)) for name in ("ts", *CANDLE_PRICE_COLUMNS))
+
+    @classmethod
+    def from_candles(cls, candles: List[Dict[str, Any]], source: str = "unknown") -> CandleColumns:
+        count = len(candles)
+        ts = np.fromiter(
+            (int(datetime.fromisoformat(candle["ts"]).timestamp()) for candle in candles), dtype=np.int64, count=count
+        )
+        columns = {
+            name: np.fromiter((candle.get(name) or 0 for candle in candles), dtype=np.float64, count=count)
+            for name in CANDLE_PRICE_COLUMNS
+        }
+        return cls(ts=ts, source=source, **columns)
+
+    def to_candles(self, symbol: str, timeframe: str = "1d") -> List[Dict[str, Any]]:
+        stamps = [_epoch_to_iso(value) for value in self.ts.tolist()]
+        rows = zip(stamps, *(getattr(self, name).tolist() for name in CANDLE_PRICE_COLUMNS))
+        return [
+            {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "ts": ts,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+                "adjClose": adj_close,
+            }
+            for ts, open_, high, low, close, volume, adj_close in rows
+        ]
+
+
+@lru_cache(maxsize=65536)
+def _parse_day(text: str) -> int:
+    """Epoch seconds for a YYYY-MM-DD date; each distinct date is parsed once per process."""
+    return int(datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+@lru_cache(maxsize=65536)
+def _epoch_to_iso(value: int) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+def parse_csv_columns(csv_text: str, source: str = "stooq") -> CandleColumns:
+    """
+    Parse a Stooq daily CSV straight into typed columns without building a dict per row.
+    Rows with a malformed date or price, or missing fields, are skipped.
+    """
     if "Exceeded the daily hits limit" in csv_text:
         raise RuntimeError("stooq_limit")
-    rows: List[Dict[str, Any]] = []
-    reader = csv.DictReader(csv_text.splitlines())
+    reader = csv.reader(io.StringIO(csv_text))
+    header = next(reader, None) or []
+    position = {name: idx for idx, name in enumerate(header)}
+    ts: List[int] = []
+    prices: List[tuple[float, float, float, float, float]] = []
+    try:
+        date_idx, open_idx, high_idx, low_idx, close_idx = (
+            position[name] for name in ("Date", "Open", "High", "Low", "Close")
+        )
+    except KeyError:
+        return CandleColumns.from_candles([], source)
+    volume_idx = position.get("Volume")
     for record in reader:
+        if not record:
+            continue
         try:
-            rows.append(
-                {
-                    "symbol": meta.symbol if meta else record.get("Symbol", ""),
-                    "timeframe": "1d",
-                    "ts": datetime.strptime(record["Date"], "%Y-%m-%d")
-                    .replace(tzinfo=timezone.utc)
-                    .isoformat(),
-                    "open": float(record["Open"]),
-                    "high": float(record["High"]),
-                    "low": float(record["Low"]),
-                    "close": float(record["Close"]),
-                    "volume": float(record.get("Volume", 0) or 0),
-                    "adjClose": float(record["Close"]),
-                }
+            volume = record[volume_idx] if volume_idx is not None and volume_idx < len(record) else ""
+            row = (
+                float(record[open_idx]),
+                float(record[high_idx]),
+                float(record[low_idx]),
+                float(record[close_idx]),
+                float(volume or 0),
             )
-        except (ValueError, KeyError):
+            ts.append(_parse_day(record[date_idx]))
+        except (ValueError, IndexError):
             continue
-    return rows
+        prices.append(row)
+    table = np.array(prices, dtype=np.float64).reshape(-1, 5)
+    return CandleColumns(
+        ts=np.array(ts, dtype=np.int64),
+        open=table[:, 0],
+        high=table[:, 1],
+        low=table[:, 2],
+        close=table[:, 3],
+        volume=table[:, 4],
+        adjClose=table[:, 3].copy(),
+        source=source,
+    )
+
+
+def parse_csv(csv_text: str, meta: SymbolMeta | None) -> List[Dict[str, Any]]:
+    return parse_csv_columns(csv_text).to_candles(meta.symbol if meta else "")
+
+
+def candle_store_dir(symbol: str) -> Path:
+    return DATA_DIR / "symbols" / symbol / "columns"
+
+
+def write_candle_store(symbol: str, columns: CandleColumns) -> None:
+    """Persist one `.npy` file per column plus a small manifest next to ohlcv.json."""
+    store_dir = candle_store_dir(symbol)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("ts", *CANDLE_PRICE_COLUMNS):
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(getattr(columns, name)))
+        if not _same_content(store_dir / f"{name}.npy", buffer.getvalue()):
+            _write_atomic(store_dir / f"{name}.npy", buffer.getvalue())
+            metrics().add("bytesWritten", buffer.tell())
+    manifest = {"symbol": symbol, "rows": len(columns), "source": columns.source, "tsUnit": "s"}
+    _write_atomic(store_dir / "manifest.json", json.dumps(manifest).encode("utf-8"))
+
+
+def read_candle_store(symbol: str, mmap: bool = True) -> Optional[CandleColumns]:
+    """Load a symbol's columnar history, memory-mapped by default so nothing is copied up front."""
+    store_dir = candle_store_dir(symbol)
+    try:
+        manifest = json.loads((store_dir / "manifest.json").read_text(encoding="utf-8"))
+        arrays = {
+            name: np.load(store_dir / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in ("ts", *CANDLE_PRICE_COLUMNS)
+        }
+    except (OSError, ValueError):
+        return None
+    if any(len(array) != manifest.get("rows") for array in arrays.values()):
+        return None
+    return CandleColumns(source=manifest.get("source", "unknown"), **arrays)
+
+
+def load_stored_columns(meta: SymbolMeta) -> Optional[CandleColumns]:
+    """
+    Return the history from a previous run when it came from a real source, preferring the
+    columnar store over ohlcv.json. Synthetic or unlabelled histories are ignored so the next
+    run refetches them in full.
+    """
+    columns = read_candle_store(meta.symbol)
+    if columns is None:
+        path = PUBLISH_DIR / "symbols" / meta.symbol / "ohlcv.json"
+        if not path.exists():
+            return None
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            columns = CandleColumns.from_candles(payload.get("candles") or [], payload.get("source", "unknown"))
+        except (OSError, ValueError, KeyError):
+            return None
+    if columns.source not in INCREMENTAL_SOURCES or not len(columns):
+        return None
+    return columns
+
+
+def next_fetch_date(columns: Optional[CandleColumns]) -> Optional[date]:
+    if columns is None or not len(columns):
+        return None
+    return datetime.fromtimestamp(int(columns.ts[-1]), timezone.utc).date() + timedelta(days=1)
+
+
+def _period_keys(ts: np.ndarray, timeframe: str) -> np.ndarray:
+    """Epoch day of the period each bar falls in: the ISO week's Monday or the month's first day."""
+    days = ts // 86400
+    if timeframe == "1w":
+        return days - (days + 3) % 7
+    if timeframe == "1mo":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    raise ValueError(f"unsupported timeframe: {timeframe}")
+
+
+def _aggregate_bars(columns: CandleColumns, starts: np.ndarray, ts: np.ndarray) -> CandleColumns:
+    """Collapse the runs beginning at `starts` into single OHLCV bars stamped with `ts`."""
+    ends = np.r_[starts[1:], len(columns)] - 1
+    return CandleColumns(
+        ts=ts,
+        open=columns.open[starts],
+        high=np.maximum.reduceat(columns.high, starts),
+        low=np.minimum.reduceat(columns.low, starts),
+        close=columns.close[ends],
+        volume=np.add.reduceat(columns.volume, starts),
+        adjClose=columns.adjClose[ends],
+        source=columns.source,
+    )
+
+
+def resample_columns(columns: CandleColumns, timeframe: str) -> CandleColumns:
+    """
+    Aggregate ordered bars into `timeframe` bars in one vectorized pass: first open, max high,
+    min low, last close and adjClose, summed volume. Bars are stamped with the period start;
+    the most recent period may be partial.
+    """
+    if not len(columns):
+        return columns
+    keys = _period_keys(columns.ts, timeframe)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return _aggregate_bars(columns, starts, keys[starts] * 86400)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: keep the first and last point and, from each of the
+    `threshold - 2` buckets in between, the point spanning the largest triangle with the point
+    kept before it and the average of the next bucket.
+    """
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else count
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:stop] - y[previous]) - (x[previous] - x[start:stop]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_columns(columns: CandleColumns, max_points: int, method: str = "minmax") -> CandleColumns:
+    """
+    Reduce `columns` to at most `max_points` bars. "minmax" merges equal-width runs into OHLC bars,
+    so every high and low survives; "lttb" keeps the original bars that best preserve the close line.
+    """
+    if method == "none" or len(columns) <= max_points:
+        return columns
+    if method == "lttb":
+        return columns.take(lttb_indices(columns.ts.astype(np.float64), columns.close, max_points))
+    starts = np.unique(np.linspace(0, len(columns), max_points, endpoint=False).astype(np.int64))
+    return _aggregate_bars(columns, starts, columns.ts[starts])
+
+
+def range_slice(columns: CandleColumns, days: int) -> Optional[CandleColumns]:
+    """Bars from the last `days` calendar days, or None when the history does not reach back that far."""
+    if not len(columns):
+        return None
+    cutoff = int(columns.ts[-1]) - days * 86400
+    if int(columns.ts[0]) > cutoff + 7 * 86400:
+        return None
+    return columns.tail(len(columns) - int(np.searchsorted(columns.ts, cutoff)))
 
 
 def percent_change(current: float, previous: float) -> float:
@@ -183,10 +950,6 @@ def percent_change(current: float, previous: float) -> float:
     return (current - previous) / previous * 100.0
 
 
-def take_last(items: List[float], window: int) -> List[float]:
-    return items if len(items) <= window else items[-window:]
-
-
 def mean(values: Iterable[float]) -> float:
     values = list(values)
     if not values:
@@ -194,70 +957,369 @@ def mean(values: Iterable[float]) -> float:
     return sum(values) / len(values)
 
 
-def stddev(values: Iterable[float]) -> float:
-    values = list(values)
-    if not values:
-        return 0.0
-    avg = mean(values)
-    variance = sum((value - avg) ** 2 for value in values) / len(values)
-    return math.sqrt(variance)
+def closes_array(candles: List[Dict[str, Any]]) -> np.ndarray:
+    return np.fromiter((candle["close"] for candle in candles), dtype=np.float64, count=len(candles))
 
 
-def ema_series(values: List[float], period: int) -> List[float]:
-    if not values:
-        return []
-    k = 2 / (period + 1)
-    ema_values = [values[0]]
-    for value in values[1:]:
-        ema_values.append(value * k + ema_values[-1] * (1 - k))
-    return ema_values
+def rolling_np(values: np.ndarray, window: int, reducer: Any = np.mean) -> np.ndarray:
+    """
+    Apply `reducer` over a trailing window along the last axis.
+    The first window - 1 points use the shorter prefix available.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    out = np.empty(values.shape, dtype=np.float64)
+    for idx in range(min(window - 1, n)):
+        out[..., idx] = reducer(values[..., : idx + 1], axis=-1)
+    if n >= window:
+        out[..., window - 1 :] = reducer(sliding_window_view(values, window, axis=-1), axis=-1)
+    return out
+
+
+_EMA_BLOCK = 64
+
+
+def ema_np(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    EMA along the last axis seeded with the first value.
+    Each block of _EMA_BLOCK points is solved in closed form from the previous block's last value,
+    which keeps the decay powers well inside float64 range.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty(values.shape, dtype=np.float64)
+    n = values.shape[-1]
+    if n == 0:
+        return out
+    alpha = 2 / (period + 1)
+    decay = 1 - alpha
+    if decay == 0:
+        out[...] = values
+        return out
+    out[..., 0] = values[..., 0]
+    start = 1
+    while start < n:
+        block = values[..., start : start + _EMA_BLOCK]
+        powers = decay ** np.arange(block.shape[-1])
+        weighted = np.cumsum(block / powers, axis=-1) * powers
+        prev = out[..., start - 1 : start]
+        out[..., start : start + block.shape[-1]] = prev * powers * decay + alpha * weighted
+        start += block.shape[-1]
+    return out
+
+
+def rsi_np(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """Simple-average RSI over the trailing `period` deltas; 100 when there are no losses."""
+    closes = np.asarray(closes, dtype=np.float64)
+    out = np.full(closes.shape, 100.0)
+    if closes.shape[-1] < 2:
+        return out
+    deltas = np.diff(closes, axis=-1)
+    avg_gain = rolling_np(np.maximum(deltas, 0), period)
+    avg_loss = rolling_np(np.maximum(-deltas, 0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[..., 1:] = np.where(avg_loss == 0, 100.0, rsi)
+    return out
+
+
+def indicator_series(closes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Full time series for every indicator, aligned with `closes`.
+    Values agree with the former per-element Python loops to within 1e-9 of the price scale;
+    the only differences come from summation order.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    bb_middle = rolling_np(closes, 20)
+    bb_std = rolling_np(closes, 20, np.std)
+    ema12 = ema_np(closes, 12)
+    ema26 = ema_np(closes, 26)
+    macd = ema12 - ema26
+    signal = ema_np(macd, 9)
+    return {
+        "sma20": bb_middle,
+        "sma50": rolling_np(closes, 50),
+        "bbUpper": bb_middle + bb_std * 2,
+        "bbMiddle": bb_middle,
+        "bbLower": bb_middle - bb_std * 2,
+        "rsi14": rsi_np(closes, 14),
+        "ema12": ema12,
+        "ema26": ema26,
+        "macd": macd,
+        "signal": signal,
+        "histogram": macd - signal,
+    }
+
+
+# Longest lookback of any indicator (SMA50); it also covers Bollinger(20) and the 14 RSI deltas.
+INDICATOR_WINDOW = 50
+INDICATOR_NAMES = ("sma20", "sma50", "bbUpper", "bbMiddle", "bbLower", "rsi14", "ema12", "ema26", "macd", "signal", "histogram")
+
+
+@dataclass
+class IndicatorState:
+    """What indicator_series needs to extend its output by one bar without the earlier history."""
+
+    ts: int
+    tail: List[float]
+    ema12: float
+    ema26: float
+    signal: float
+
+    @classmethod
+    def from_series(cls, ts: np.ndarray, closes: np.ndarray, series: Dict[str, np.ndarray]) -> IndicatorState:
+        return cls(
+            ts=int(ts[-1]),
+            tail=closes[-INDICATOR_WINDOW:].tolist(),
+            ema12=float(series["ema12"][-1]),
+            ema26=float(series["ema26"][-1]),
+            signal=float(series["signal"][-1]),
+        )
+
+
+def _ema_step(previous: float, value: float, period: int) -> float:
+    alpha = 2 / (period + 1)
+    return previous * (1 - alpha) + alpha * value
+
+
+def advance_indicators(state: IndicatorState, ts: np.ndarray, closes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Extend the series by the bars in `closes`, updating `state` in place. Each bar costs
+    O(INDICATOR_WINDOW): the rolling statistics are re-reduced over the carried tail instead of
+    kept as running sums, so they never drift from what indicator_series would produce.
+    """
+    out = {name: np.empty(len(closes)) for name in INDICATOR_NAMES}
+    tail = np.asarray(state.tail, dtype=np.float64)
+    for idx, close in enumerate(closes.tolist()):
+        tail = np.append(tail, close)[-INDICATOR_WINDOW:]
+        window20 = tail[-20:]
+        middle = float(window20.mean())
+        std = float(window20.std())
+        deltas = np.diff(tail[-15:])
+        avg_loss = float(np.maximum(-deltas, 0).mean()) if deltas.size else 0.0
+        if avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + float(np.maximum(deltas, 0).mean()) / avg_loss)
+        state.ema12 = _ema_step(state.ema12, close, 12)
+        state.ema26 = _ema_step(state.ema26, close, 26)
+        macd = state.ema12 - state.ema26
+        state.signal = _ema_step(state.signal, macd, 9)
+        row = {
+            "sma20": middle,
+            "sma50": float(tail.mean()),
+            "bbUpper": middle + std * 2,
+            "bbMiddle": middle,
+            "bbLower": middle - std * 2,
+            "rsi14": rsi,
+            "ema12": state.ema12,
+            "ema26": state.ema26,
+            "macd": macd,
+            "signal": state.signal,
+            "histogram": macd - state.signal,
+        }
+        for name in INDICATOR_NAMES:
+            out[name][idx] = row[name]
+    state.tail = tail.tolist()
+    if len(ts):
+        state.ts = int(ts[-1])
+    return out
+
+
+def indicator_store_dir(symbol: str) -> Path:
+    return DATA_DIR / "symbols" / symbol / "indicators"
+
+
+# The indicator store keeps one headerless little-endian column per series so new bars are
+# appended in place; state.json records how many rows are valid. Once a column holds this many
+# rows it is rewritten with just the ones aligned with the candle store.
+INDICATOR_STORE_MAX_ROWS = 2 * STORE_HISTORY_DAYS
+_INDICATOR_STORE_DTYPES = {"ts": np.dtype("<i8"), **{name: np.dtype("<f8") for name in INDICATOR_NAMES}}
+
+
+def write_indicator_store(symbol: str, ts: np.ndarray, series: Dict[str, np.ndarray], state: IndicatorState) -> None:
+    """Replace the whole store with `series` (first run, revised history or compaction)."""
+    store_dir = indicator_store_dir(symbol)
+    for name, values in (("ts", ts), *series.items()):
+        data = np.ascontiguousarray(values, dtype=_INDICATOR_STORE_DTYPES[name]).tobytes()
+        _write_atomic(store_dir / f"{name}.bin", data)
+        metrics().add("bytesWritten", len(data))
+    _write_atomic(store_dir / "state.json", json.dumps({"rows": len(ts), **asdict(state)}).encode("utf-8"))
+    for legacy in store_dir.glob("*.npy"):
+        legacy.unlink(missing_ok=True)
+
+
+def append_indicator_store(
+    symbol: str, rows: int, ts: np.ndarray, series: Dict[str, np.ndarray], state: IndicatorState
+) -> None:
+    """
+    Write the new bars after the `rows` already stored, then commit them by rewriting state.json.
+    Bytes left past `rows` by an interrupted append are overwritten or truncated here.
+    """
+    store_dir = indicator_store_dir(symbol)
+    for name, values in (("ts", ts), *series.items()):
+        dtype = _INDICATOR_STORE_DTYPES[name]
+        data = np.ascontiguousarray(values, dtype=dtype).tobytes()
+        with open(store_dir / f"{name}.bin", "r+b") as handle:
+            handle.seek(rows * dtype.itemsize)
+            handle.write(data)
+            handle.truncate()
+        metrics().add("bytesWritten", len(data))
+    payload = {"rows": rows + len(ts), **asdict(state)}
+    _write_atomic(store_dir / "state.json", json.dumps(payload).encode("utf-8"))
+
+
+def read_indicator_store(symbol: str) -> Optional[Tuple[np.ndarray, Dict[str, np.ndarray], IndicatorState]]:
+    """The stored ts and series, memory-mapped so only the rows a caller touches are read."""
+    store_dir = indicator_store_dir(symbol)
+    try:
+        payload = json.loads((store_dir / "state.json").read_text(encoding="utf-8"))
+        rows = int(payload.pop("rows"))
+        state = IndicatorState(**payload)
+        columns = {
+            name: np.memmap(store_dir / f"{name}.bin", dtype=dtype, mode="r", shape=(rows,))
+            for name, dtype in _INDICATOR_STORE_DTYPES.items()
+        }
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    ts = columns.pop("ts")
+    if not rows or int(ts[-1]) != state.ts:
+        return None
+    return ts, columns, state
+
+
+def update_indicator_series(symbol: str, columns: CandleColumns) -> Dict[str, np.ndarray]:
+    """
+    Indicator series aligned with `columns`. When the stored state ends on a bar of `columns`
+    and the closes it carries still match, only the newer bars are folded in and appended to the
+    store; otherwise (first run, revised history) everything is recomputed and rewritten.
+    """
+    stored = read_indicator_store(symbol)
+    if stored is not None:
+        ts, series, state = stored
+        end = int(np.searchsorted(columns.ts, state.ts)) + 1
+        tail = columns.close[max(0, end - INDICATOR_WINDOW) : end]
+        aligned = (
+            end <= len(columns)
+            and int(columns.ts[end - 1]) == state.ts
+            and len(tail) == len(state.tail)
+            and np.array_equal(tail, state.tail)
+            and end <= len(ts)
+            and np.array_equal(ts[len(ts) - end :], columns.ts[:end])
+        )
+        if aligned:
+            if end == len(columns):
+                return {name: values[len(values) - end :] for name, values in series.items()}
+            added = advance_indicators(state, columns.ts[end:], columns.close[end:])
+            metrics().add("indicatorBarsAppended", len(columns) - end)
+            rows = len(ts)
+            series = {
+                name: np.concatenate([values[len(values) - end :], added[name]]) for name, values in series.items()
+            }
+            if rows + len(columns) - end > INDICATOR_STORE_MAX_ROWS:
+                write_indicator_store(symbol, columns.ts, series, state)
+            else:
+                append_indicator_store(symbol, rows, columns.ts[end:], added, state)
+            return series
+    metrics().add("indicatorRecomputes")
+    closes = np.asarray(columns.close, dtype=np.float64)
+    series = indicator_series(closes)
+    write_indicator_store(symbol, columns.ts, series, IndicatorState.from_series(columns.ts, closes, series))
+    return series
+
+
+def return_stats(closes: np.ndarray, window: int = 60) -> tuple[float, float]:
+    """Mean and population stddev of the last `window` daily returns, skipping zero prices."""
+    closes = np.asarray(closes, dtype=np.float64)
+    prev = closes[:-1]
+    valid = prev != 0
+    returns = (closes[1:][valid] - prev[valid]) / prev[valid]
+    recent = returns[-window:]
+    if recent.size == 0:
+        return 0.0, 0.0
+    return float(recent.mean()), float(recent.std())
 
 
 def compute_indicators(candles: List[Dict[str, Any]]) -> Dict[str, Any]:
-    closes = [candle["close"] for candle in candles]
-    sma20 = mean(take_last(closes, 20))
-    sma50 = mean(take_last(closes, 50))
-    bb_window = take_last(closes, 20)
-    bb_middle = mean(bb_window)
-    bb_std = stddev(bb_window)
-    upper = bb_middle + bb_std * 2
-    lower = bb_middle - bb_std * 2
-
-    rsi_period = 14
-    gains = []
-    losses = []
-    for idx in range(1, len(closes)):
-        delta = closes[idx] - closes[idx - 1]
-        gains.append(max(delta, 0))
-        losses.append(max(-delta, 0))
-    avg_gain = mean(take_last(gains, rsi_period))
-    avg_loss = mean(take_last(losses, rsi_period))
-    if avg_loss == 0:
-        rsi14 = 100.0
-    else:
-        rs = avg_gain / avg_loss
-        rsi14 = 100 - (100 / (1 + rs))
+    closes = closes_array(candles)
+    if closes.size == 0:
+        return {
+            "rsi14": 100.0,
+            "sma": {"sma20": 0.0, "sma50": 0.0},
+            "bollinger": {"upper": 0.0, "middle": 0.0, "lower": 0.0},
+            "macd": {"macd": 0.0, "signal": 0.0, "histogram": 0.0},
+            "lastClose": 0.0,
+        }
+    return latest_indicators(indicator_series(closes), closes)
 
-    ema12 = ema_series(closes, 12)
-    ema26 = ema_series(closes, 26)
-    macd_series = [ema12[i] - ema26[i] for i in range(min(len(ema12), len(ema26)))]
-    signal_series = ema_series(macd_series, 9)
-    macd_value = macd_series[-1] if macd_series else 0.0
-    signal_value = signal_series[-1] if signal_series else 0.0
-    histogram = macd_value - signal_value
 
+def latest_indicators(series: Dict[str, np.ndarray], closes: np.ndarray) -> Dict[str, Any]:
+    """The scalar indicators payload for the last bar of `series`."""
+    last = {key: float(values[-1]) for key, values in series.items()}
     return {
-        "rsi14": rsi14,
-        "sma": {"sma20": sma20, "sma50": sma50},
-        "bollinger": {"upper": upper, "middle": bb_middle, "lower": lower},
-        "macd": {"macd": macd_value, "signal": signal_value, "histogram": histogram},
-        "lastClose": closes[-1] if closes else 0.0,
+        "rsi14": last["rsi14"],
+        "sma": {"sma20": last["sma20"], "sma50": last["sma50"]},
+        "bollinger": {"upper": last["bbUpper"], "middle": last["bbMiddle"], "lower": last["bbLower"]},
+        "macd": {"macd": last["macd"], "signal": last["signal"], "histogram": last["histogram"]},
+        "lastClose": float(closes[-1]),
     }
 
 
+def write_range_slices(
+    meta: SymbolMeta, source: str, by_timeframe: Dict[str, CandleColumns], ranges_dir: Path
+) -> Dict[str, Any]:
+    """
+    Write one ohlcv payload per CHART_RANGES entry the history covers, downsampled to
+    RANGE_MAX_POINTS with DOWNSAMPLE, remove the slices of ranges it no longer covers, and
+    return the manifest describing the ones written.
+    """
+    entries = []
+    for name, (days, timeframe) in CHART_RANGES.items():
+        window = range_slice(by_timeframe[timeframe], days)
+        if window is None:
+            continue
+        sampled = downsample_columns(window, RANGE_MAX_POINTS, DOWNSAMPLE)
+        candles = sampled.to_candles(meta.symbol, timeframe)
+        downsampled = len(sampled) < len(window)
+        write_json(
+            ranges_dir / f"{name}.json",
+            {
+                "symbol": meta.symbol,
+                "range": name,
+                "timeframe": timeframe,
+                "tz": meta.tz,
+                "source": source,
+                "downsampled": downsampled,
+                "candles": candles,
+            },
+        )
+        entries.append(
+            {
+                "range": name,
+                "timeframe": timeframe,
+                "bars": len(window),
+                "points": len(candles),
+                "downsampled": downsampled,
+                "from": _epoch_to_iso(int(window.ts[0])),
+                "to": _epoch_to_iso(int(window.ts[-1])),
+            }
+        )
+    # Ranges the history no longer covers would otherwise keep serving an earlier run's candles.
+    written = {entry["range"] for entry in entries}
+    if ranges_dir.is_dir():
+        for path in ranges_dir.iterdir():
+            name, _, extension = path.name.partition(".")
+            if extension in ("json", "json.gz", "json.br") and name not in written:
+                path.unlink(missing_ok=True)
+    return {"symbol": meta.symbol, "maxPoints": RANGE_MAX_POINTS, "downsample": DOWNSAMPLE, "ranges": entries}
+
+
+def indicators_payload(symbol: str, timeframe: str, indicators: Dict[str, Any]) -> Dict[str, Any]:
+    return {"symbol": symbol, "timeframe": timeframe, **{k: v for k, v in indicators.items() if k != "lastClose"}}
+
+
 def compute_forecast(symbol: str, candles: List[Dict[str, Any]]) -> Dict[str, Any]:
-    closes = [candle["close"] for candle in candles]
-    if not closes:
+    closes = closes_array(candles)
+    if not closes.size:
         return {
             "symbol": symbol,
             "model": "Drift + Volatility Cone",
@@ -267,30 +1329,23 @@ def compute_forecast(symbol: str, candles: List[Dict[str, Any]]) -> Dict[str, An
         }
 
     horizon = 30
-    returns = []
-    for idx in range(1, len(closes)):
-        prev = closes[idx - 1]
-        if prev == 0:
-            continue
-        returns.append((closes[idx] - prev) / prev)
-    recent_returns = take_last(returns, 60)
-    mean_return = mean(recent_returns)
-    volatility = stddev(recent_returns) or 0.02
-    last_close = closes[-1]
-
-    bands = []
-    for step in range(1, horizon + 1):
-        projected = last_close * ((1 + mean_return) ** step)
-        spread = projected * volatility * math.sqrt(step)
-        bands.append(
-            {
-                "step": step,
-                "ts": (TODAY + timedelta(days=step)).isoformat(),
-                "mid": projected,
-                "lower": projected - spread,
-                "upper": projected + spread,
-            }
-        )
+    mean_return, volatility = return_stats(closes, 60)
+    volatility = volatility or 0.02
+    last_close = float(closes[-1])
+
+    steps = np.arange(1, horizon + 1)
+    projected = last_close * (1 + mean_return) ** steps
+    spread = projected * volatility * np.sqrt(steps)
+    bands = [
+        {
+            "step": step,
+            "ts": (TODAY + timedelta(days=step)).isoformat(),
+            "mid": mid,
+            "lower": mid - width,
+            "upper": mid + width,
+        }
+        for step, mid, width in zip(steps.tolist(), projected.tolist(), spread.tolist())
+    ]
     return {
         "symbol": symbol,
         "model": "Drift + Volatility Cone",
@@ -300,18 +1355,98 @@ def compute_forecast(symbol: str, candles: List[Dict[str, Any]]) -> Dict[str, An
     }
 
 
-def generate_synthetic_candles(meta: SymbolMeta, days: int = 730) -> List[Dict[str, Any]]:
-    rng = random.Random(meta.symbol)
-    base_price = rng.uniform(20, 250)
-    price = base_price
-    candles: List[Dict[str, Any]] = []
-    for idx in range(days):
-        current_date = TODAY - timedelta(days=days - idx)
-        change = rng.uniform(-0.035, 0.035)
-        open_price = price
-        close_price = max(1.0, price * (1 + change))
-        high_price = max(open_price, close_price) * (1 + rng.uniform(0, 0.01))
-        low_price = min(open_price, close_price) * (1 - rng.uniform(0, 0.01))
+MC_PERCENTILES = (5, 25, 50, 75, 95)
+MC_LOOKBACK = {"gbm": 60, "bootstrap": 250}
+MC_CHUNK = 1024
+
+
+def symbol_rng(symbol: str) -> np.random.Generator:
+    """NumPy generator seeded from the ticker, so a symbol's draws repeat from run to run."""
+    return np.random.default_rng(int.from_bytes(hashlib.sha256(symbol.encode("utf-8")).digest()[:8], "little"))
+
+
+def monte_carlo_paths(
+    closes: np.ndarray, rng: np.random.Generator, method: str, paths: int, horizon: int
+) -> np.ndarray:
+    """
+    Simulated closes, shape (paths, horizon), float32. "gbm" draws normal log returns with the mean
+    and stddev of the last 60 days; "bootstrap" resamples the last 250 observed log returns.
+    Paths are drawn MC_CHUNK at a time so the float64 temporaries stay small for any `paths`.
+    """
+    prices = closes[-(MC_LOOKBACK[method] + 1) :]
+    prices = prices[prices > 0]
+    log_returns = np.diff(np.log(prices)) if prices.size > 1 else np.zeros(1)
+    mu = float(log_returns.mean())
+    sigma = float(log_returns.std()) or 0.02
+    out = np.empty((paths, horizon), dtype=np.float32)
+    for start in range(0, paths, MC_CHUNK):
+        count = min(MC_CHUNK, paths - start)
+        if method == "bootstrap":
+            steps = log_returns[rng.integers(0, log_returns.size, size=(count, horizon))]
+        else:
+            steps = rng.normal(mu, sigma, size=(count, horizon))
+        out[start : start + count] = float(closes[-1]) * np.exp(np.cumsum(steps, axis=1))
+    return out
+
+
+def monte_carlo_forecast(
+    symbol: str, candles: List[Dict[str, Any]], method: str = "gbm", paths: int = 2000
+) -> Dict[str, Any]:
+    """
+    Percentile bands over simulated paths in the cone's `bands` schema: mid is the median,
+    lower/upper the 5th/95th percentiles, with p25/p75 alongside.
+    """
+    label = "GBM" if method == "gbm" else "Bootstrap"
+    closes = closes_array(candles)
+    if not closes.size:
+        return {
+            "symbol": symbol,
+            "model": f"Monte Carlo ({label})",
+            "horizonDays": 30,
+            "methodology": "Insufficient data",
+            "bands": [],
+        }
+    horizon = 30
+    simulated = monte_carlo_paths(closes, symbol_rng(symbol), method, paths, horizon)
+    p5, p25, p50, p75, p95 = np.percentile(simulated, MC_PERCENTILES, axis=0).tolist()
+    bands = [
+        {
+            "step": step,
+            "ts": (TODAY + timedelta(days=step)).isoformat(),
+            "mid": p50[idx],
+            "lower": p5[idx],
+            "upper": p95[idx],
+            "p25": p25[idx],
+            "p75": p75[idx],
+        }
+        for idx, step in enumerate(range(1, horizon + 1))
+    ]
+    if method == "bootstrap":
+        methodology = f"{paths} paths resampling the last {MC_LOOKBACK[method]} daily log returns; 5/25/50/75/95th percentiles."
+    else:
+        methodology = f"{paths} geometric Brownian motion paths fitted to the last {MC_LOOKBACK[method]} daily log returns; 5/25/50/75/95th percentiles."
+    return {
+        "symbol": symbol,
+        "model": f"Monte Carlo ({label})",
+        "horizonDays": horizon,
+        "methodology": methodology,
+        "paths": paths,
+        "bands": bands,
+    }
+
+
+def generate_synthetic_candles(meta: SymbolMeta, days: int = 730) -> List[Dict[str, Any]]:
+    rng = random.Random(meta.symbol)
+    base_price = rng.uniform(20, 250)
+    price = base_price
+    candles: List[Dict[str, Any]] = []
+    for idx in range(days):
+        current_date = TODAY - timedelta(days=days - idx)
+        change = rng.uniform(-0.035, 0.035)
+        open_price = price
+        close_price = max(1.0, price * (1 + change))
+        high_price = max(open_price, close_price) * (1 + rng.uniform(0, 0.01))
+        low_price = min(open_price, close_price) * (1 - rng.uniform(0, 0.01))
         volume = rng.randint(500_000, 15_000_000)
         candles.append(
             {
@@ -330,32 +1465,69 @@ def generate_synthetic_candles(meta: SymbolMeta, days: int = 730) -> List[Dict[s
     return candles
 
 
-def load_yfinance_candles(meta: SymbolMeta, period: str = "5y") -> Optional[List[Dict[str, Any]]]:
-    try:
-        df = yf.download(meta.symbol, period=period, interval="1d", progress=False, threads=False)
-    except Exception as exc:
-        print(f"[warn] yfinance error for {meta.symbol}: {exc}")
-        return None
-    if df.empty:
+def yfinance_frame_columns(frame: Any) -> Optional[CandleColumns]:
+    """One ticker's yfinance frame as columns; bars with a missing open/high/low/close are dropped."""
+    prices = frame[["Open", "High", "Low", "Close"]].to_numpy(dtype=np.float64)
+    keep = ~np.isnan(prices).any(axis=1)
+    if not keep.any():
         return None
-    candles: List[Dict[str, Any]] = []
-    for ts, row in df.iterrows():
-        if any(value != value for value in (row.get("Open"), row.get("High"), row.get("Low"), row.get("Close"))):
+    index = frame.index[keep]
+    if index.tz is not None:
+        index = index.tz_localize(None)  # wall-clock dates, stamped as UTC like the Stooq bars
+    close = prices[keep, 3]
+    volume = frame["Volume"].to_numpy(dtype=np.float64)[keep] if "Volume" in frame else np.zeros(len(close))
+    adj_close = frame["Adj Close"].to_numpy(dtype=np.float64)[keep] if "Adj Close" in frame else close.copy()
+    return CandleColumns(
+        ts=index.values.astype("datetime64[s]").astype(np.int64),
+        open=prices[keep, 0],
+        high=prices[keep, 1],
+        low=prices[keep, 2],
+        close=close,
+        volume=volume,
+        adjClose=adj_close,
+        source="yfinance",
+    )
+
+
+def load_yfinance_columns(metas: List[SymbolMeta], period: str = "5y") -> Dict[str, CandleColumns]:
+    """
+    Daily history for several symbols through multi-ticker yfinance downloads of up to YFINANCE_BATCH
+    tickers each. Every ticker still spends one "yahoo" quota token; tickers without data are left out.
+    """
+    allowed: List[SymbolMeta] = []
+    for meta in metas:
+        if RATE_LIMITS["yahoo"].acquire():
+            allowed.append(meta)
+        else:
+            print(f"[warn] yahoo quota exhausted, skipping yfinance for {meta.symbol}")
+    if not allowed:
+        return {}
+    import yfinance as yf  # deferred: pulls in pandas, which dominates import time
+
+    loaded: Dict[str, CandleColumns] = {}
+    for start in range(0, len(allowed), YFINANCE_BATCH):
+        tickers = [meta.symbol for meta in allowed[start : start + YFINANCE_BATCH]]
+        try:
+            with metrics().timer("yfinance"):
+                df = yf.download(
+                    tickers, period=period, interval="1d", group_by="ticker", progress=False, threads=True
+                )
+        except Exception as exc:
+            print(f"[warn] yfinance error for {', '.join(tickers)}: {exc}")
             continue
-        candles.append(
-            {
-                "symbol": meta.symbol,
-                "timeframe": "1d",
-                "ts": ts.to_pydatetime().replace(tzinfo=timezone.utc).isoformat(),
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-                "volume": float(row.get("Volume", 0) or 0),
-                "adjClose": float(row.get("Adj Close", row["Close"]))
-            }
-        )
-    return candles
+        if df is None or df.empty:
+            continue
+        for symbol in tickers:
+            if df.columns.nlevels > 1:
+                if symbol not in df.columns.get_level_values(0):
+                    continue
+                frame = df[symbol]
+            else:
+                frame = df
+            columns = yfinance_frame_columns(frame)
+            if columns is not None:
+                loaded[symbol] = columns
+    return loaded
 
 
 def traffic_light_score(indicators: Dict[str, Any]) -> str:
@@ -376,6 +1548,156 @@ def traffic_light_score(indicators: Dict[str, Any]) -> str:
     return "YELLOW"
 
 
+def traffic_light_scores(analytics: Dict[str, np.ndarray]) -> np.ndarray:
+    """Vectorized counterpart of `traffic_light_score` returning the raw score per symbol."""
+    sma50 = analytics["sma50"]
+    trend_component = np.tanh((analytics["sma20"] - sma50) / np.where(sma50 == 0, 1, sma50))
+    rsi_component = 1 - np.minimum(np.abs(50 - analytics["rsi14"]) / 50, 1)
+    middle = np.where(analytics["bbMiddle"] == 0, 1, analytics["bbMiddle"])
+    width_component = 1 - np.minimum((analytics["bbUpper"] - analytics["bbLower"]) / middle, 1)
+    return 0.4 * trend_component + 0.4 * rsi_component + 0.2 * width_component
+
+
+def stack_candles(candle_lists: List[List[Dict[str, Any]]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Right-align per-symbol histories into (symbols x days) close and volume matrices.
+    The returned mask marks real bars; shorter histories are padded on the left.
+    """
+    width = max((len(candles) for candles in candle_lists), default=0)
+    closes = np.full((len(candle_lists), width), np.nan)
+    volumes = np.zeros((len(candle_lists), width))
+    mask = np.zeros((len(candle_lists), width), dtype=bool)
+    for row, candles in enumerate(candle_lists):
+        if not candles:
+            continue
+        start = width - len(candles)
+        closes[row, start:] = closes_array(candles)
+        volumes[row, start:] = np.fromiter(
+            (candle.get("volume") or 0 for candle in candles), dtype=np.float64, count=len(candles)
+        )
+        mask[row, start:] = True
+    return closes, volumes, mask
+
+
+UNIVERSE_CHUNK = 512
+
+
+def universe_analytics(
+    closes: np.ndarray, volumes: np.ndarray, mask: np.ndarray, chunk: int = UNIVERSE_CHUNK
+) -> Dict[str, np.ndarray]:
+    """
+    Latest indicator values, price changes and forecast drift/volatility for every row of a
+    right-aligned (symbols x days) matrix, `chunk` symbols at a time.
+    Each row reproduces what compute_indicators/compute_forecast return for that symbol alone;
+    rows without any valid bar come back as NaN with valid=False.
+    """
+    closes = np.where(mask, closes, np.nan)
+    count, width = closes.shape
+    keys = (
+        "lastClose", "prevClose", "changePct", "change1m", "lastVolume", "sma20", "sma50", "bbUpper",
+        "bbMiddle", "bbLower", "rsi14", "macd", "signal", "histogram", "drift", "volatility",
+    )
+    out = {key: np.full(count, np.nan) for key in keys}
+    lengths = mask.sum(axis=1)
+    rows = np.arange(count)
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for start in range(0, count, chunk):
+            part = slice(start, start + chunk)
+            block = closes[part]
+            block_len = lengths[part]
+            block_rows = rows[part] - start
+            if width == 0:
+                break
+
+            last = block[:, -1]
+            prev = np.where(block_len > 1, block[:, -2] if width > 1 else last, last)
+            month = block[block_rows, width - np.clip(block_len, 1, 21)]
+            out["lastClose"][part] = last
+            out["prevClose"][part] = prev
+            out["changePct"][part] = np.where(prev == 0, 0.0, (last - prev) / prev * 100.0)
+            out["change1m"][part] = np.where(month == 0, 0.0, (last - month) / month * 100.0)
+            out["lastVolume"][part] = volumes[part, -1]
+
+            middle = np.nanmean(block[:, -20:], axis=1)
+            spread = np.nanstd(block[:, -20:], axis=1) * 2
+            out["sma20"][part] = middle
+            out["sma50"][part] = np.nanmean(block[:, -50:], axis=1)
+            out["bbMiddle"][part] = middle
+            out["bbUpper"][part] = middle + spread
+            out["bbLower"][part] = middle - spread
+
+            # Back-filling the left padding with each row's first close makes the EMA seed and
+            # the RSI gain/loss ratio identical to the per-symbol computation.
+            first = block[block_rows, width - np.maximum(block_len, 1)]
+            filled = np.where(np.isnan(block), first[:, None], block)
+            deltas = np.diff(filled[:, -15:], axis=1)
+            gains = np.maximum(deltas, 0).sum(axis=1)
+            losses = np.maximum(-deltas, 0).sum(axis=1)
+            out["rsi14"][part] = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+            macd = ema_np(filled, 12) - ema_np(filled, 26)
+            signal = ema_np(macd, 9)
+            out["macd"][part] = macd[:, -1]
+            out["signal"][part] = signal[:, -1]
+            out["histogram"][part] = macd[:, -1] - signal[:, -1]
+
+            prev_close = block[:, :-1]
+            returns = (block[:, 1:] - prev_close) / prev_close
+            valid = np.isfinite(returns) & (prev_close != 0)
+            recent = valid & (np.cumsum(valid[:, ::-1], axis=1)[:, ::-1] <= 60)
+            returns = np.where(recent, returns, np.nan)
+            out["drift"][part] = np.where(recent.any(axis=1), np.nanmean(returns, axis=1), 0.0)
+            out["volatility"][part] = np.where(recent.any(axis=1), np.nanstd(returns, axis=1), 0.0)
+
+    valid_rows = lengths > 0
+    for key in keys:
+        out[key][~valid_rows] = np.nan
+    out["trafficScore"] = traffic_light_scores(out)
+    out["trafficLight"] = np.where(
+        out["trafficScore"] >= 0.2, "GREEN", np.where(out["trafficScore"] <= -0.2, "RED", "YELLOW")
+    )
+    out["valid"] = valid_rows
+    return out
+
+
+def analytics_indicators(analytics: Dict[str, np.ndarray], row: int) -> Dict[str, Any]:
+    """Reshape one row of `universe_analytics` into the compute_indicators payload."""
+    value = {key: float(analytics[key][row]) for key in analytics if analytics[key].dtype.kind == "f"}
+    return {
+        "rsi14": value["rsi14"],
+        "sma": {"sma20": value["sma20"], "sma50": value["sma50"]},
+        "bollinger": {"upper": value["bbUpper"], "middle": value["bbMiddle"], "lower": value["bbLower"]},
+        "macd": {"macd": value["macd"], "signal": value["signal"], "histogram": value["histogram"]},
+        "lastClose": value["lastClose"],
+    }
+
+
+def batch_snapshots(metas: List[SymbolMeta], candle_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Build the snapshot dicts consumed by build_rankings, build_sector_overview and
+    build_market_overview for a whole universe in one vectorized pass.
+    """
+    analytics = universe_analytics(*stack_candles(candle_lists))
+    snapshots = []
+    for row, (meta, candles) in enumerate(zip(metas, candle_lists)):
+        if not analytics["valid"][row]:
+            continue
+        snapshots.append(
+            {
+                "meta": meta,
+                "indicators": analytics_indicators(analytics, row),
+                "trafficLight": str(analytics["trafficLight"][row]),
+                "dividendYield": meta.dividend_yield,
+                "changePct": float(analytics["changePct"][row]),
+                "change1m": float(analytics["change1m"][row]),
+                "drift": float(analytics["drift"][row]),
+                "volatility": float(analytics["volatility"][row]),
+                "latest": candles[-1],
+            }
+        )
+    return snapshots
+
+
 def build_insight(meta: SymbolMeta, indicators: Dict[str, Any], latest_change: float) -> Dict[str, Any]:
     traffic_light = traffic_light_score(indicators)
     state = {
@@ -440,8 +1762,14 @@ def fetch_alpha_overview(symbol: str) -> Optional[Dict[str, float]]:
         return None
     url = "https://www.alphavantage.co/query"
     params = {"function": "OVERVIEW", "symbol": symbol, "apikey": ALPHA_KEY}
-    response = requests.get(url, params=params, timeout=30)
-    if response.status_code != 200:
+    with metrics().timer("alpha_overview"):
+        response = http_get(
+            url,
+            params=params,
+            source="alpha_overview",
+            limiter=RATE_LIMITS["alphavantage.co"],
+        )
+    if response is None or response.status_code != 200:
         return None
     data = response.json()
     if "Symbol" not in data:
@@ -455,108 +1783,618 @@ def fetch_alpha_overview(symbol: str) -> Optional[Dict[str, float]]:
     }
 
 
-def write_json(path: Path, payload: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, indent=2)
+def fundamentals_path() -> Path:
+    return DATA_DIR / "fundamentals.json"
 
 
-def build_market_overview(symbol_snapshots: List[Dict[str, Any]], index_snapshots: List[Dict[str, Any]], fx_snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
-    heatmap = [
-        {
-            "symbol": snapshot["meta"].symbol,
-            "sector": snapshot["meta"].sector,
-            "changePct": snapshot["changePct"],
-            "weight": max(1.0, math.log((snapshot["latest"].get("volume") or 0) + 1, 10) ** 2),
-            "lastClose": snapshot["latest"]["close"],
-        }
-        for snapshot in symbol_snapshots
-    ]
-    return {
-        "lastUpdated": TODAY.isoformat(),
-        "indices": [
-            {
-                "symbol": index["symbol"],
-                "name": index["name"],
-                "level": index["lastClose"],
-                "changePct": index["changePct"],
-            }
-            for index in index_snapshots
-        ],
-        "fx": [
+class FundamentalsStore:
+    """
+    Alpha Vantage OVERVIEW values per symbol with the time each was last requested and refreshed,
+    plus the calls spent on the current UTC day. Persisted in data/fundamentals.json after every
+    refresh; readers may query it while the refresher thread updates it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            payload = {}
+        self.entries: Dict[str, Dict[str, Any]] = payload.get("symbols") or {}
+        quota = payload.get("quota") or {}
+        self.day = datetime.now(timezone.utc).date().isoformat()
+        self.used_today = int(quota.get("used", 0)) if quota.get("date") == self.day else 0
+
+    def dividend_yield(self, meta: SymbolMeta, default: Optional[float] = None) -> float:
+        """Cached yield for the symbol, else `default`, else the universe's static value."""
+        with self._lock:
+            entry = self.entries.get(meta.symbol) or {}
+        return entry.get("dividendYield", meta.dividend_yield if default is None else default)
+
+    def stalest(self, symbols: List[str], limit: int) -> List[str]:
+        """Up to `limit` symbols not requested within FUNDAMENTALS_MAX_AGE, never-requested ones first."""
+        cutoff = (datetime.now(timezone.utc) - FUNDAMENTALS_MAX_AGE).isoformat(timespec="seconds")
+        with self._lock:
+            requested = [(self.entries.get(symbol, {}).get("requestedAt", ""), symbol) for symbol in symbols]
+        stale = [item for item in requested if item[0] < cutoff]
+        return [symbol for _, symbol in heapq.nsmallest(limit, stale, key=lambda item: item[0])]
+
+    def record(self, symbol: str, overview: Optional[Dict[str, float]]) -> None:
+        """Count one Alpha Vantage call for `symbol`; a failed call keeps the previous values."""
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            entry = self.entries.setdefault(symbol, {})
+            entry["requestedAt"] = now
+            if overview is not None:
+                entry.update(overview)
+                entry["refreshedAt"] = now
+            self.used_today += 1
+            payload = {"version": 1, "quota": {"date": self.day, "used": self.used_today}, "symbols": self.entries}
+            _write_atomic(self.path, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+
+def refresh_fundamentals(store: FundamentalsStore, symbols: List[str], stop: threading.Event) -> int:
+    """
+    Spend what is left of today's Alpha Vantage quota on the stalest store entries. Meant to run on
+    its own thread next to the price pipeline; returns the number of calls made, stopping early once
+    `stop` is set.
+    """
+    if not ALPHA_KEY:
+        return 0
+    limiter = RATE_LIMITS["alphavantage.co"]
+    budget = len(symbols) if limiter.daily_quota is None else max(0, limiter.daily_quota - store.used_today)
+    calls = 0
+    for symbol in store.stalest(symbols, budget):
+        # Pace here rather than inside the limiter so a stop request never waits out the interval.
+        if stop.wait(1 / limiter.rate if calls else 0):
+            break
+        try:
+            overview = fetch_alpha_overview(symbol)
+        except (requests.RequestException, ValueError) as exc:
+            print(f"[warn] alpha vantage error for {symbol}: {exc}")
+            overview = None
+        store.record(symbol, overview)
+        calls += 1
+    metrics().add("fundamentalsRequests", calls)
+    return calls
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _same_content(path: Path, data: bytes) -> bool:
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(data).digest()
+    except OSError:
+        return False
+
+
+def write_json(path: Path, payload: Any) -> bool:
+    """
+    Serialize compactly and publish via temp file + rename so readers never see a partial file.
+    Identical content is left untouched. Precompressed .gz/.br siblings follow PRECOMPRESS and
+    are removed when the JSON changes without them being requested, so they never go stale.
+    Returns True when the JSON file was rewritten.
+    """
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    with metrics().timer("write_json"):
+        changed = not _same_content(path, data)
+        if changed:
+            _write_atomic(path, data)
+            metrics().add("bytesWritten", len(data))
+        else:
+            metrics().add("writesSkipped")
+        for encoding in ("gz", "br"):
+            sibling = path.with_name(f"{path.name}.{encoding}")
+            if encoding in PRECOMPRESS:
+                if changed or not sibling.exists():
+                    compressed = _compress(data, encoding)
+                    _write_atomic(sibling, compressed)
+                    metrics().add("bytesWritten", len(compressed))
+            elif changed and sibling.exists():
+                sibling.unlink()
+    return changed
+
+
+CURRENT_POINTER = "CURRENT"
+
+
+def generations_dir() -> Path:
+    return DATA_DIR / "generations"
+
+
+def current_generation() -> Optional[Path]:
+    """The generation named by data/CURRENT, or None when publishing in place."""
+    try:
+        name = (DATA_DIR / CURRENT_POINTER).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    path = generations_dir() / name
+    return path if name and path.is_dir() else None
+
+
+def start_generation(started: datetime) -> Path:
+    """
+    Create the directory for this run's generation and seed it with hard links to the current
+    one. write_json replaces files by rename, so the links are never written through: unchanged
+    files cost nothing and the previous generation stays intact for readers and rollback.
+    """
+    base = started.strftime("%Y%m%dT%H%M%SZ")
+    path = generations_dir() / base
+    suffix = 1
+    while path.exists():
+        path = generations_dir() / f"{base}-{suffix}"
+        suffix += 1
+    previous = current_generation()
+    if previous is None:
+        path.mkdir(parents=True)
+        return path
+    try:
+        shutil.copytree(previous, path, copy_function=os.link)
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+        shutil.copytree(previous, path)
+    return path
+
+
+def publish_generation(path: Path) -> None:
+    """
+    Point readers at `path` in one step: data/CURRENT (read by the API) is replaced atomically,
+    and the data/current symlink follows it for static file servers where symlinks are available.
+    """
+    _write_atomic(DATA_DIR / CURRENT_POINTER, f"{path.name}\n".encode())
+    link = DATA_DIR / "current"
+    tmp = link.with_name(f"current.{os.getpid()}.tmp")
+    try:
+        if tmp.is_symlink():
+            tmp.unlink()
+        tmp.symlink_to(Path("generations") / path.name, target_is_directory=True)
+        os.replace(tmp, link)
+    except OSError as exc:
+        print(f"[warn] could not update {link}: {exc}")
+
+
+def unpublish_generations() -> bool:
+    """
+    Remove data/CURRENT and the data/current symlink after an in-place run, so readers go back to
+    data/ itself. The generations stay on disk until a later --generations run collects them.
+    """
+    removed = False
+    for path in (DATA_DIR / CURRENT_POINTER, DATA_DIR / "current"):
+        if path.is_symlink() or path.is_file():
+            path.unlink()
+            removed = True
+    return removed
+
+
+def gc_generations(keep: int) -> List[Path]:
+    """
+    Keep the current generation plus the `keep - 1` before it for rollback. Generations newer than
+    the current one were abandoned by a failed run or rolled back from, so they go too.
+    """
+    current = current_generation()
+    if current is None:
+        return []
+    generations = sorted((path for path in generations_dir().iterdir() if path.is_dir()), reverse=True)
+    retained = [path for path in generations if path.name <= current.name][: max(keep, 1)]
+    removed = [path for path in generations if path not in retained]
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+def rollback_generation() -> Path:
+    """Re-publish the newest generation older than the current one."""
+    current = current_generation()
+    if current is None:
+        raise SystemExit("No current generation to roll back from.")
+    older = sorted(path for path in generations_dir().iterdir() if path.is_dir() and path.name < current.name)
+    if not older:
+        raise SystemExit(f"No generation older than {current.name} is left.")
+    publish_generation(older[-1])
+    return older[-1]
+
+
+def journal_path(shard: Optional[Tuple[int, int]] = None) -> Path:
+    day = TODAY.date().isoformat()
+    return DATA_DIR / "journal" / (f"{day}.jsonl" if shard is None else f"{day}.shard-{shard[0]}-of-{shard[1]}.jsonl")
+
+
+# Snapshot fields the aggregate builders read. analyze_symbol returns only these plus the SymbolMeta
+# (forecast and insight are already on disk), and the journal stores the same.
+SNAPSHOT_FIELDS = ("changePct", "change1m", "dividendYield", "latest", "indicators")
+
+
+def snapshot_record(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-ready form of a snapshot: the SymbolMeta as a dict plus SNAPSHOT_FIELDS."""
+    return {"meta": asdict(snapshot["meta"]), **{name: snapshot[name] for name in SNAPSHOT_FIELDS}}
+
+
+def snapshot_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {"meta": SymbolMeta(**record["meta"]), **{name: record[name] for name in SNAPSHOT_FIELDS}}
+
+
+# Run settings that shape the per-symbol files; a journal written under other values is not resumed.
+_JOURNAL_SETTINGS = ("PRECOMPRESS", "RANGE_MAX_POINTS", "DOWNSAMPLE", "FORECAST_MODEL", "MC_PATHS")
+
+
+class RunJournal:
+    """
+    Append-only JSON-lines record of the symbols a run has finished, so a crashed or killed run
+    can resume on the same UTC day without refetching them. The first line names the directory the
+    per-symbol files went to and the settings they were written with; a torn last line is ignored.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._handle: Optional[io.TextIOBase] = None
+
+    def resume(self, generations: bool, discard: bool = False) -> Tuple[Optional[Path], Dict[str, Dict[str, Any]]]:
+        """
+        Output directory and completed snapshots of today's unfinished run, if it used the same settings
+        and wrote either in place or (with `generations`) into a generation that was never published.
+        A generation left behind by a run that is not resumed is deleted so it can never be rolled back to.
+        """
+        records = []
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        header = records[0] if records else {}
+        publish_dir = Path(header.get("publishDir", ""))
+        unpublished = publish_dir.parent == generations_dir() and publish_dir != current_generation()
+        unpublished = unpublished and publish_dir.is_dir()
+        usable = unpublished if generations else publish_dir == DATA_DIR
+        if discard or not usable or header.get("settings") != _journal_settings():
+            if unpublished:
+                print(f"[info] discarding unfinished generation {publish_dir.name}")
+                shutil.rmtree(publish_dir, ignore_errors=True)
+            return None, {}
+        completed = {}
+        for record in records[1:]:
+            snapshot = snapshot_from_record(record)
+            completed[snapshot["meta"].symbol] = snapshot
+        return publish_dir, completed
+
+    def start(self, publish_dir: Path, resuming: bool) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a" if resuming else "w", encoding="utf-8")
+        if not resuming:
+            self._write({"publishDir": str(publish_dir), "settings": _journal_settings()})
+
+    def watch(self, future: Future) -> Future:
+        """Journal the snapshot once `future` resolves; failed or skipped symbols are left for the next run."""
+        future.add_done_callback(lambda done: self.record(done.result()) if done.exception() is None else None)
+        return future
+
+    def record(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        if snapshot is not None:
+            self._write(snapshot_record(snapshot))
+
+    def finish(self) -> None:
+        """The run is published: nothing is left to resume."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self.path.unlink(missing_ok=True)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._handle.write(line)
+            self._handle.flush()
+
+
+def _journal_settings() -> Dict[str, Any]:
+    # Round-tripped through JSON so tuples compare equal to the lists read back from the journal.
+    return json.loads(json.dumps({name: globals()[name] for name in _JOURNAL_SETTINGS}))
+
+
+HEATMAP_SIZE = 50
+SECTOR_MOVERS = 3
+
+
+class MarketOverviewBuilder:
+    """Heatmap for markets/overview.json, fed one snapshot at a time; only the first HEATMAP_SIZE are kept."""
+
+    def __init__(self) -> None:
+        self.heatmap: List[Dict[str, Any]] = []
+
+    def add(self, snapshot: Dict[str, Any]) -> None:
+        if len(self.heatmap) >= HEATMAP_SIZE:
+            return
+        self.heatmap.append(
             {
-                "pair": fx["pair"],
-                "rate": fx["lastClose"],
-                "changePct": fx["changePct"],
+                "symbol": snapshot["meta"].symbol,
+                "sector": snapshot["meta"].sector,
+                "changePct": snapshot["changePct"],
+                "weight": max(1.0, math.log((snapshot["latest"].get("volume") or 0) + 1, 10) ** 2),
+                "lastClose": snapshot["latest"]["close"],
             }
-            for fx in fx_snapshots
-        ],
-        "heatmap": heatmap[:50],
-    }
+        )
+
+    def build(self, index_snapshots: List[Dict[str, Any]], fx_snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "lastUpdated": TODAY.isoformat(),
+            "indices": [
+                {
+                    "symbol": index["symbol"],
+                    "name": index["name"],
+                    "level": index["lastClose"],
+                    "changePct": index["changePct"],
+                }
+                for index in index_snapshots
+            ],
+            "fx": [
+                {
+                    "pair": fx["pair"],
+                    "rate": fx["lastClose"],
+                    "changePct": fx["changePct"],
+                }
+                for fx in fx_snapshots
+            ],
+            "heatmap": self.heatmap,
+        }
+
+
+def build_market_overview(symbol_snapshots: List[Dict[str, Any]], index_snapshots: List[Dict[str, Any]], fx_snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    builder = MarketOverviewBuilder()
+    for snapshot in symbol_snapshots:
+        builder.add(snapshot)
+    return builder.build(index_snapshots, fx_snapshots)
+
+
+@dataclass
+class _SectorTotals:
+    country: str
+    count: int = 0
+    change_1d: float = 0.0
+    change_1m: float = 0.0
+    # Min-heaps of (changePct, tiebreak, symbol) bounded at SECTOR_MOVERS entries.
+    leaders: List[Tuple[float, int, str]] = field(default_factory=list)
+    laggards: List[Tuple[float, int, str]] = field(default_factory=list)
+
+
+class SectorOverviewBuilder:
+    """
+    sectors/overview.json from running sums and bounded heaps per sector. Leaders and laggards come
+    out exactly as from a stable sort by changePct (descending) over the whole sector.
+    """
+
+    def __init__(self) -> None:
+        self.sectors: Dict[str, _SectorTotals] = {}
+
+    def add(self, snapshot: Dict[str, Any]) -> None:
+        meta: SymbolMeta = snapshot["meta"]
+        totals = self.sectors.get(meta.sector)
+        if totals is None:
+            totals = self.sectors[meta.sector] = _SectorTotals(country=meta.country)
+        change = snapshot["changePct"]
+        position = totals.count
+        totals.count += 1
+        totals.change_1d += change
+        totals.change_1m += snapshot["change1m"]
+        # Leaders keep the largest changes, earlier symbols first on ties; laggards keep the smallest,
+        # later symbols last on ties, matching sorted(..., reverse=True)[-3:].
+        leader = (change, -position, meta.symbol)
+        laggard = (-change, position, meta.symbol)
+        for heap, item in ((totals.leaders, leader), (totals.laggards, laggard)):
+            if len(heap) < SECTOR_MOVERS:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heappushpop(heap, item)
+
+    def build(self) -> Dict[str, Any]:
+        data = []
+        for sector, totals in self.sectors.items():
+            data.append(
+                {
+                    "name": sector,
+                    "theme": sector,
+                    "performance1d": totals.change_1d / totals.count,
+                    "performance1m": totals.change_1m / totals.count,
+                    "leaders": [symbol for _, _, symbol in sorted(totals.leaders, reverse=True)],
+                    "laggards": [symbol for _, _, symbol in sorted(totals.laggards)],
+                    "tags": [totals.country],
+                }
+            )
+        return {"lastUpdated": TODAY.isoformat(), "data": data}
 
 
 def build_sector_overview(symbol_snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
-    sectors: Dict[str, List[Dict[str, Any]]] = {}
+    builder = SectorOverviewBuilder()
     for snapshot in symbol_snapshots:
-        sectors.setdefault(snapshot["meta"].sector, []).append(snapshot)
-    data = []
-    for sector, snapshots in sectors.items():
-        sorted_snaps = sorted(snapshots, key=lambda s: s["changePct"], reverse=True)
-        data.append(
-            {
-                "name": sector,
-                "theme": sector,
-                "performance1d": mean(snapshot["changePct"] for snapshot in snapshots),
-                "performance1m": mean(snapshot["change1m"] for snapshot in snapshots),
-                "leaders": [snap["meta"].symbol for snap in sorted_snaps[:3]],
-                "laggards": [snap["meta"].symbol for snap in sorted_snaps[-3:]],
-                "tags": [snapshots[0]["meta"].country],
-            }
-        )
-    return {"lastUpdated": TODAY.isoformat(), "data": data}
+        builder.add(snapshot)
+    return builder.build()
+
+
+# name -> (metric, "top" | "bottom", K). gainers and dividends keep their original payloads.
+RANKING_LISTS: Dict[str, Tuple[str, str, int]] = {
+    "gainers": ("changePct", "top", 20),
+    "losers": ("changePct", "bottom", 20),
+    "monthGainers": ("change1m", "top", 20),
+    "monthLosers": ("change1m", "bottom", 20),
+    "dividends": ("dividendYield", "top", 100),
+    "volumeLeaders": ("volume", "top", 20),
+    "rsiOverbought": ("rsi14", "top", 20),
+    "rsiOversold": ("rsi14", "bottom", 20),
+}
+RANKING_METRICS = ("changePct", "change1m", "dividendYield", "volume", "rsi14")
+GROUP_MOVERS_K = 5
+_RANKING_GETTERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "changePct": lambda snap: snap["changePct"],
+    "change1m": lambda snap: snap["change1m"],
+    "dividendYield": lambda snap: snap.get("dividendYield", 0),
+    "volume": lambda snap: snap["latest"].get("volume") or 0,
+    "rsi14": lambda snap: snap["indicators"]["rsi14"],
+    "lastClose": lambda snap: snap["indicators"]["lastClose"],
+}
+
+
+class RankingColumns:
+    """
+    The ranking metrics of every symbol as growing float64 columns next to its SymbolMeta, fed one
+    snapshot at a time. Rankings, group movers and ranks.json are all computed from these columns.
+    """
 
+    def __init__(self) -> None:
+        self.metas: List[SymbolMeta] = []
+        self._columns: Dict[str, array] = {name: array("d") for name in _RANKING_GETTERS}
 
-def build_rankings(symbol_snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
-    gainers = sorted(symbol_snapshots, key=lambda s: s["changePct"], reverse=True)
-    dividends = sorted(symbol_snapshots, key=lambda s: s.get("dividendYield", 0), reverse=True)
+    @classmethod
+    def from_snapshots(cls, symbol_snapshots: Iterable[Dict[str, Any]]) -> RankingColumns:
+        columns = cls()
+        for snapshot in symbol_snapshots:
+            columns.add(snapshot)
+        return columns
 
-    gainers_payload = [
-        {
-            "rank": idx + 1,
-            "symbol": snapshot["meta"].symbol,
-            "name": snapshot["meta"].name,
-            "exchange": snapshot["meta"].exchange,
-            "changePct": snapshot["changePct"],
-            "lastPrice": snapshot["indicators"]["lastClose"],
-        }
-        for idx, snapshot in enumerate(gainers[:20])
-    ]
+    def __len__(self) -> int:
+        return len(self.metas)
 
-    dividends_payload = [
-        {
-            "rank": idx + 1,
-            "symbol": snapshot["meta"].symbol,
-            "name": snapshot["meta"].name,
-            "exchange": snapshot["meta"].exchange,
-            "dividendYield": snapshot.get("dividendYield", 0),
-            "lastPrice": snapshot["indicators"]["lastClose"],
-        }
-        for idx, snapshot in enumerate(dividends[:100])
-    ]
+    def add(self, snapshot: Dict[str, Any]) -> None:
+        self.metas.append(snapshot["meta"])
+        for name, getter in _RANKING_GETTERS.items():
+            self._columns[name].append(getter(snapshot))
+
+    def refresh(self, name: str, value: Callable[[SymbolMeta, float], float]) -> None:
+        """Recompute one column from each row's meta and current value, e.g. dividend yields refreshed later."""
+        rows = zip(self.metas, self._columns[name])
+        self._columns[name] = array("d", (value(meta, current) for meta, current in rows))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """One float64 column per ranking metric, in insertion order."""
+        return {name: np.array(values, dtype=np.float64) for name, values in self._columns.items()}
+
+
+def top_k_indices(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """
+    Indices of the `k` largest (or smallest) values, best first, in O(n) plus O(k log k).
+    Ties keep input order, exactly like a stable sorted(...)[:k]; NaN always comes last.
+    """
+    values = np.nan_to_num(values, nan=-np.inf if largest else np.inf)
+    keyed = -values if largest else values
+    if k <= 0 or not len(keyed):
+        return np.empty(0, dtype=np.int64)
+    if k < len(keyed):
+        threshold = keyed[np.argpartition(keyed, k - 1)[:k]].max()
+        candidates = np.flatnonzero(keyed <= threshold)
+    else:
+        candidates = np.arange(len(keyed))
+    return candidates[np.lexsort((candidates, keyed[candidates]))][:k]
+
+
+def _ranking_item(meta: SymbolMeta, last_price: float, rank: int, metric: str, value: float) -> Dict[str, Any]:
     return {
-        "lastUpdated": TODAY.isoformat(),
-        "gainers": gainers_payload,
-        "dividends": dividends_payload,
+        "rank": rank,
+        "symbol": meta.symbol,
+        "name": meta.name,
+        "exchange": meta.exchange,
+        metric: value,
+        "lastPrice": last_price,
     }
 
 
-def build_symbols_index(symbol_snapshots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    items = []
-    for idx, snapshot in enumerate(symbol_snapshots, start=1):
+def build_rankings(columns: RankingColumns, arrays: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, Any]:
+    """Every RANKING_LISTS list via partial selection over the metric columns; nothing is fully sorted."""
+    arrays = arrays if arrays is not None else columns.arrays()
+    last_close = arrays["lastClose"]
+    rankings: Dict[str, Any] = {"lastUpdated": TODAY.isoformat()}
+    for name, (metric, side, k) in RANKING_LISTS.items():
+        rankings[name] = [
+            _ranking_item(columns.metas[row], float(last_close[row]), rank, metric, float(arrays[metric][row]))
+            for rank, row in enumerate(top_k_indices(arrays[metric], k, side == "top").tolist(), start=1)
+        ]
+    return rankings
+
+
+def build_group_movers(columns: RankingColumns, arrays: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, Any]:
+    """Top and bottom GROUP_MOVERS_K movers by changePct within each sector and each country."""
+    arrays = arrays if arrays is not None else columns.arrays()
+    change, last_close = arrays["changePct"], arrays["lastClose"]
+    payload: Dict[str, Any] = {"lastUpdated": TODAY.isoformat()}
+    for key, attribute in (("bySector", "sector"), ("byCountry", "country")):
+        labels = np.array([getattr(meta, attribute) for meta in columns.metas], dtype=object)
+        groups = {}
+        for label in sorted(set(labels.tolist())):
+            members = np.flatnonzero(labels == label)
+            groups[label] = {
+                side: [
+                    _ranking_item(columns.metas[row], float(last_close[row]), rank, "changePct", float(change[row]))
+                    for rank, row in enumerate(
+                        members[top_k_indices(change[members], GROUP_MOVERS_K, side == "gainers")].tolist(), start=1
+                    )
+                ]
+                for side in ("gainers", "losers")
+            }
+        payload[key] = groups
+    return payload
+
+
+def percentile_ranks(arrays: Dict[str, np.ndarray]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Per metric: 1-based rank (1 = highest, ties share the best rank) and mid-rank percentile
+    (share of the universe below, counting ties as half), from one sort per metric.
+    """
+    ranks = {}
+    for metric in RANKING_METRICS:
+        values = np.nan_to_num(arrays[metric], nan=-np.inf)
+        ordered = np.sort(values)
+        below = np.searchsorted(ordered, values, side="left")
+        not_above = np.searchsorted(ordered, values, side="right")
+        ranks[metric] = {
+            "rank": len(values) - not_above + 1,
+            "percentile": (below + (not_above - below) / 2) / len(values) * 100,
+        }
+    return ranks
+
+
+def write_symbol_ranks(columns: RankingColumns, arrays: Optional[Dict[str, np.ndarray]] = None) -> None:
+    """symbols/<SYM>/ranks.json: where the symbol stands in the universe on every ranking metric."""
+    arrays = arrays if arrays is not None else columns.arrays()
+    ranks = percentile_ranks(arrays)
+    universe = len(columns)
+    table = {
+        metric: (arrays[metric].tolist(), ranked["rank"].tolist(), ranked["percentile"].tolist())
+        for metric, ranked in ranks.items()
+    }
+    for row, meta in enumerate(columns.metas):
+        write_json(
+            PUBLISH_DIR / "symbols" / meta.symbol / "ranks.json",
+            {
+                "symbol": meta.symbol,
+                "lastUpdated": TODAY.isoformat(),
+                "universe": universe,
+                "metrics": {
+                    metric: {"value": values[row], "rank": rank[row], "percentile": percentile[row]}
+                    for metric, (values, rank, percentile) in table.items()
+                },
+            },
+        )
+
+
+class SymbolsIndexBuilder:
+    """symbols/index.json entries appended as snapshots arrive; ids follow arrival order from 1."""
+
+    def __init__(self) -> None:
+        self.items: List[Dict[str, Any]] = []
+
+    def add(self, snapshot: Dict[str, Any]) -> None:
         meta: SymbolMeta = snapshot["meta"]
-        items.append(
+        self.items.append(
             {
-                "id": idx,
+                "id": len(self.items) + 1,
                 "symbol": meta.symbol,
                 "exchange": meta.exchange,
                 "currency": meta.currency,
@@ -567,17 +2405,242 @@ def build_symbols_index(symbol_snapshots: List[Dict[str, Any]]) -> List[Dict[str
                 "country": meta.country,
             }
         )
-    return items
 
 
-def process_symbol(meta: SymbolMeta) -> Optional[Dict[str, Any]]:
-    candles: Optional[List[Dict[str, Any]]] = None
+def build_symbols_index(symbol_snapshots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    builder = SymbolsIndexBuilder()
+    for snapshot in symbol_snapshots:
+        builder.add(snapshot)
+    return builder.items
+
+
+class UniverseAggregates:
+    """Every aggregate builder of a run, fed the same snapshots in universe order."""
+
+    def __init__(self) -> None:
+        self.rankings = RankingColumns()
+        self.sectors = SectorOverviewBuilder()
+        self.overview = MarketOverviewBuilder()
+        self.index = SymbolsIndexBuilder()
+
+    def __len__(self) -> int:
+        return len(self.rankings)
+
+    def add(self, snapshot: Dict[str, Any]) -> None:
+        for builder in (self.rankings, self.sectors, self.overview, self.index):
+            builder.add(snapshot)
+
+    def publish(
+        self,
+        index_snapshots: List[Dict[str, Any]],
+        fx_snapshots: List[Dict[str, Any]],
+        fundamentals: FundamentalsStore,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+        """
+        Write markets/, sectors/, rankings/, symbols/index.json (+ search index), every ranks.json and
+        dictionary.json under PUBLISH_DIR. Dividend yields are re-read from `fundamentals` first.
+        Returns the symbols index, market overview and rankings for the sample export.
+        """
+        self.rankings.refresh("dividendYield", fundamentals.dividend_yield)
+        with metrics().timer("aggregates"):
+            ranking_arrays = self.rankings.arrays()
+            rankings = build_rankings(self.rankings, ranking_arrays)
+            group_movers = build_group_movers(self.rankings, ranking_arrays)
+            sector_overview = self.sectors.build()
+            market_overview = self.overview.build(index_snapshots, fx_snapshots)
+            symbols_index = self.index.items
+        dictionary = load_dictionary()
+
+        write_json(PUBLISH_DIR / "markets" / "overview.json", market_overview)
+        write_json(PUBLISH_DIR / "sectors" / "overview.json", sector_overview)
+        write_json(PUBLISH_DIR / "rankings" / "top_lists.json", rankings)
+        write_json(PUBLISH_DIR / "rankings" / "top_movers.json", {"lastUpdated": rankings["lastUpdated"], "items": rankings["gainers"]})
+        write_json(PUBLISH_DIR / "rankings" / "dividends.json", {"lastUpdated": rankings["lastUpdated"], "items": rankings["dividends"]})
+        write_json(PUBLISH_DIR / "rankings" / "groups.json", group_movers)
+        with metrics().timer("ranks"):
+            write_symbol_ranks(self.rankings, ranking_arrays)
+        write_json(PUBLISH_DIR / "symbols" / "index.json", symbols_index)
+        write_json(PUBLISH_DIR / "symbols" / "search_index.json", build_search_index(symbols_index))
+        write_json(PUBLISH_DIR / "dictionary.json", dictionary)
+        return symbols_index, market_overview, rankings
+
+
+def shard_of(symbol: str, shards: int) -> int:
+    """Stable shard for a symbol: the same on every machine, Python version and run."""
+    return int.from_bytes(hashlib.sha256(symbol.encode("utf-8")).digest()[:8], "big") % shards
+
+
+def shards_dir() -> Path:
+    return DATA_DIR / "shards"
+
+
+class ShardPartial:
+    """
+    What the merge step needs from one shard: its symbols' slim snapshots tagged with their position
+    in the full universe (so the merge reproduces an unsharded run's order), plus the index and FX
+    snapshots, which only shard 0 fetches.
+    """
+
+    def __init__(self, shard: int, shards: int, positions: Dict[str, int]) -> None:
+        self.shard = shard
+        self.shards = shards
+        self.positions = positions
+        self.records: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, snapshot: Dict[str, Any]) -> None:
+        self.records.append({"position": self.positions[snapshot["meta"].symbol], **snapshot_record(snapshot)})
+
+    def write(
+        self,
+        index_snapshots: List[Dict[str, Any]],
+        fx_snapshots: List[Dict[str, Any]],
+        fundamentals: FundamentalsStore,
+    ) -> Path:
+        for record in self.records:
+            record["dividendYield"] = fundamentals.dividend_yield(SymbolMeta(**record["meta"]), record["dividendYield"])
+        path = shards_dir() / f"{self.shard}-of-{self.shards}.json"
+        payload = {
+            "shard": self.shard,
+            "shards": self.shards,
+            "universe": len(self.positions),
+            "generatedAt": TODAY.isoformat(),
+            "indices": index_snapshots,
+            "fx": fx_snapshots,
+            "symbols": self.records,
+        }
+        _write_atomic(path, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        # Partials of an earlier split into a different number of shards would make the merge refuse.
+        for stale in shards_dir().glob("*-of-*.json"):
+            if stale.stem.rpartition("-of-")[2] != str(self.shards):
+                stale.unlink(missing_ok=True)
+        return path
+
+
+def read_shard_partials(
+    paths: List[Path],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Snapshots of every shard in universe order plus the index and FX snapshots. Fails unless the
+    partials come from one split of one universe and cover every shard exactly once.
+    """
+    partials = [json.loads(path.read_text(encoding="utf-8")) for path in paths]
+    if not partials:
+        raise SystemExit(f"No shard partials to merge (looked in {shards_dir()}).")
+    layouts = {(partial["shards"], partial["universe"]) for partial in partials}
+    if len(layouts) != 1:
+        raise SystemExit(f"Shard partials come from different splits or universes: {sorted(layouts)}")
+    shards = partials[0]["shards"]
+    seen = sorted(partial["shard"] for partial in partials)
+    if seen != list(range(shards)):
+        missing = sorted(set(range(shards)) - set(seen))
+        raise SystemExit(f"Shard partials must cover shards 0..{shards - 1} once each (missing {missing}, got {seen})")
+    records = sorted(
+        (record for partial in partials for record in partial["symbols"]), key=lambda record: record["position"]
+    )
+    first = next(partial for partial in partials if partial["shard"] == 0)
+    return [snapshot_from_record(record) for record in records], first["indices"], first["fx"]
+
+
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    NFKC (full-width ASCII and half-width kana fold to their usual forms), lower-case, and
+    hiragana mapped to katakana so either script finds Japanese names. The backend's
+    SymbolSearch.normalize must stay in step with this.
+    """
+    return unicodedata.normalize("NFKC", text).lower().translate(_HIRAGANA_TO_KATAKANA)
+
+
+def build_search_index(symbols_index: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Lookup structures over symbols/index.json (entry ids are list positions): `trigrams` maps
+    every trigram of the normalized symbol, name and sector to its sorted entry ids, and `texts`
+    holds those normalized fields, newline-separated, to confirm trigram candidates and to answer
+    shorter queries.
+    """
+    trigrams: Dict[str, List[int]] = {}
+    texts = []
+    for entry_id, item in enumerate(symbols_index):
+        fields = [normalize_search_text(item.get(key) or "") for key in ("symbol", "name", "sector")]
+        texts.append("\n".join(fields))
+        grams = {text[idx : idx + 3] for text in fields for idx in range(len(text) - 2)}
+        for gram in grams:
+            trigrams.setdefault(gram, []).append(entry_id)
+    return {
+        "version": 2,
+        "size": len(symbols_index),
+        "trigrams": dict(sorted(trigrams.items())),
+        "texts": texts,
+    }
+
+
+def search_symbols(index: Dict[str, Any], query: str) -> List[int]:
+    """
+    Entry ids whose normalized symbol, name or sector contains `query`, ascending. Queries of
+    three characters or more walk the shortest trigram posting list, binary-search the others,
+    and confirm candidates against the indexed text. Shorter ones scan `texts`: they match a large
+    share of the universe anyway, so the scan costs about as much as listing the result.
+    """
+    needle = normalize_search_text(query.strip())
+    if "\n" in needle:
+        return []
+    if len(needle) < 3:
+        return [entry_id for entry_id, text in enumerate(index["texts"]) if needle in text]
+    postings = sorted(
+        (index["trigrams"].get(needle[idx : idx + 3], []) for idx in range(len(needle) - 2)), key=len
+    )
+    return [
+        entry_id
+        for entry_id in postings[0]
+        if all(_contains_sorted(posting, entry_id) for posting in postings[1:]) and needle in index["texts"][entry_id]
+    ]
+
+
+def _contains_sorted(values: List[int], value: int) -> bool:
+    position = bisect.bisect_left(values, value)
+    return position < len(values) and values[position] == value
+
+
+@dataclass
+class FetchedSymbol:
+    """Hand-off from the network stage to the analytics stage; numpy columns pickle compactly."""
+
+    meta: SymbolMeta
+    columns: Optional[CandleColumns]
+    source: str
+    dividend_yield: float
+    changed: bool = True
+    needs_fallback: bool = False
+
+
+def fetch_symbol(
+    meta: SymbolMeta,
+    incremental: bool = False,
+    defer_fallback: bool = False,
+    fundamentals: Optional[FundamentalsStore] = None,
+) -> FetchedSymbol:
+    """
+    Network stage: download (or incrementally extend) the price history; the dividend yield comes
+    from the fundamentals store (or the universe default) and never waits on Alpha Vantage.
+    `columns` is None when no real source produced data and synthetic candles are needed.
+    With `defer_fallback`, a symbol Stooq could not serve comes back with `needs_fallback` set so
+    `resolve_fallbacks` can fetch it from yfinance together with the other failures.
+    """
+    columns: Optional[CandleColumns] = None
+    stored = load_stored_columns(meta) if incremental else None
     suppress_error = False
     try:
-        csv_text = fetch_csv(meta.stooq)
-        candles = parse_csv(csv_text, meta)
+        columns = parse_csv_columns(fetch_csv(meta.stooq, next_fetch_date(stored)), "stooq")
+        if stored is not None:
+            columns = stored.merge(columns)
     except RuntimeError as exc:
         if str(exc) == "stooq_limit":
+            metrics().add("stooqLimitHits")
             print(f"[warn] stooq limit reached for {meta.symbol}, trying yfinance")
             suppress_error = True
         else:
@@ -590,30 +2653,127 @@ def process_symbol(meta: SymbolMeta) -> Optional[Dict[str, Any]]:
         print(f"[warn] unexpected stooq error for {meta.symbol}: {exc}; trying yfinance")
         suppress_error = True
 
-    if (not candles or len(candles) < 30) and suppress_error:
-        yf_candles = load_yfinance_candles(meta)
-        if yf_candles:
-            candles = yf_candles
+    fetched = FetchedSymbol(
+        meta=meta,
+        columns=columns,
+        source="stooq",
+        dividend_yield=fundamentals.dividend_yield(meta) if fundamentals else meta.dividend_yield,
+        needs_fallback=(columns is None or len(columns) < 30) and suppress_error,
+    )
+    if fetched.needs_fallback:
+        return fetched if defer_fallback else resolve_fallbacks([fetched], incremental)[0]
+    return _finish_fetch(fetched, stored)
+
+
+def resolve_fallbacks(pending: List[FetchedSymbol], incremental: bool = False) -> List[FetchedSymbol]:
+    """Fetch every symbol Stooq could not serve through batched yfinance downloads, in input order."""
+    loaded = load_yfinance_columns([item.meta for item in pending])
+    resolved = []
+    for item in pending:
+        columns = loaded.get(item.meta.symbol)
+        if columns is not None:
+            item.columns = columns
+            item.source = "yfinance"
+        item.needs_fallback = False
+        resolved.append(_finish_fetch(item, load_stored_columns(item.meta) if incremental else None))
+    return resolved
+
+
+def _finish_fetch(fetched: FetchedSymbol, stored: Optional[CandleColumns]) -> FetchedSymbol:
+    columns = fetched.columns
+    if (columns is None or not len(columns)) and stored is not None:
+        print(f"[warn] reusing stored candles for {fetched.meta.symbol}")
+        columns = stored
+
+    if columns is not None and len(columns):
+        columns = columns.tail(STORE_HISTORY_DAYS)
+    else:
+        columns = None
+    fetched.columns = columns
+    fetched.changed = columns is None or stored is None or not columns.equals(stored)
+    return fetched
+
 
-    if not candles:
+def analyze_symbol(fetched: FetchedSymbol) -> Optional[Dict[str, Any]]:
+    """
+    CPU stage: indicators, forecast, insight and per-symbol JSON. Safe to run in a worker process;
+    the task's own RunMetrics travels back under the snapshot's "metrics" key.
+    """
+    collector = RunMetrics()
+    _metrics_local.collector = collector
+    try:
+        snapshot = _analyze_symbol(fetched)
+    finally:
+        _metrics_local.collector = None
+    if snapshot is not None:
+        snapshot["metrics"] = collector
+    return snapshot
+
+
+def _analyze_symbol(fetched: FetchedSymbol) -> Optional[Dict[str, Any]]:
+    meta = fetched.meta
+    source = fetched.source
+    if fetched.columns is None:
         print(f"[warn] falling back to synthetic data for {meta.symbol}")
         candles = generate_synthetic_candles(meta)
+        source = "synthetic"
+    else:
+        candles = fetched.columns.tail(HISTORY_DAYS).to_candles(meta.symbol)
+
+    metrics().record_source(meta.symbol, source)
 
-    candles = candles[-730:]
-    indicators = compute_indicators(candles)
-    forecast = compute_forecast(meta.symbol, candles)
-    alpha = fetch_alpha_overview(meta.symbol)
-    dividend_yield = alpha["dividendYield"] if alpha else meta.dividend_yield
-    latest = candles[-1]
-    previous = candles[-2] if len(candles) > 1 else latest
-    change_pct = percent_change(latest["close"], previous["close"])
-    one_month_idx = max(len(candles) - 21, 0)
-    change_1m = percent_change(latest["close"], candles[one_month_idx]["close"])
-    insight = build_insight(meta, indicators, change_pct)
-
-    symbol_dir = DATA_DIR / "symbols" / meta.symbol
-    write_json(symbol_dir / "ohlcv.json", {"symbol": meta.symbol, "timeframe": "1d", "tz": meta.tz, "candles": candles})
-    write_json(symbol_dir / "indicators.json", {"symbol": meta.symbol, "timeframe": "1d", **{k: v for k, v in indicators.items() if k != "lastClose"}})
+    candles = candles[-HISTORY_DAYS:]
+    columns = fetched.columns if fetched.columns is not None else CandleColumns.from_candles(candles, source)
+    with metrics().timer("indicators"):
+        series = update_indicator_series(meta.symbol, columns)
+        indicators = latest_indicators(series, columns.close)
+        if FORECAST_MODEL == "cone":
+            forecast = compute_forecast(meta.symbol, candles)
+        else:
+            forecast = monte_carlo_forecast(meta.symbol, candles, FORECAST_MODEL, MC_PATHS)
+        dividend_yield = fetched.dividend_yield
+        latest = candles[-1]
+        previous = candles[-2] if len(candles) > 1 else latest
+        change_pct = percent_change(latest["close"], previous["close"])
+        one_month_idx = max(len(candles) - 21, 0)
+        change_1m = percent_change(latest["close"], candles[one_month_idx]["close"])
+        insight = build_insight(meta, indicators, change_pct)
+
+    symbol_dir = PUBLISH_DIR / "symbols" / meta.symbol
+    # `changed` compares against the candle store, which lives outside any generation; a generation
+    # that did not start from a previous one still needs its own ohlcv.json.
+    if fetched.changed or not (symbol_dir / "ohlcv.json").exists():
+        write_json(
+            symbol_dir / "ohlcv.json",
+            {"symbol": meta.symbol, "timeframe": "1d", "tz": meta.tz, "source": source, "candles": candles},
+        )
+    if fetched.changed:
+        write_candle_store(meta.symbol, columns)
+    write_json(symbol_dir / "indicators.json", indicators_payload(meta.symbol, "1d", indicators))
+    write_json(
+        symbol_dir / "indicators_series.json",
+        {
+            "symbol": meta.symbol,
+            "timeframe": "1d",
+            "ts": [_epoch_to_iso(value) for value in columns.ts[-HISTORY_DAYS:].tolist()],
+            **{name: values[-HISTORY_DAYS:].tolist() for name, values in series.items()},
+        },
+    )
+    by_timeframe = {"1d": columns}
+    with metrics().timer("timeframes"):
+        for timeframe, bars in TIMEFRAMES.items():
+            by_timeframe[timeframe] = resample_columns(columns, timeframe)
+            resampled = by_timeframe[timeframe].tail(bars).to_candles(meta.symbol, timeframe)
+            write_json(
+                symbol_dir / f"ohlcv_{timeframe}.json",
+                {"symbol": meta.symbol, "timeframe": timeframe, "tz": meta.tz, "source": source, "candles": resampled},
+            )
+            write_json(
+                symbol_dir / f"indicators_{timeframe}.json",
+                indicators_payload(meta.symbol, timeframe, compute_indicators(resampled)),
+            )
+    with metrics().timer("ranges"):
+        write_json(symbol_dir / "ranges.json", write_range_slices(meta, source, by_timeframe, symbol_dir / "ranges"))
     write_json(symbol_dir / "forecast.json", forecast)
     write_json(symbol_dir / "insights.json", insight)
     write_json(
@@ -630,37 +2790,9 @@ def process_symbol(meta: SymbolMeta) -> Optional[Dict[str, Any]]:
     )
     write_json(symbol_dir / "availableRanges.json", available_ranges(candles))
 
-    sample_symbol_path = SAMPLES_DIR / "symbols" / f"{meta.symbol}.json"
-    sample_payload = {
-        "symbol": meta.symbol,
-        "metadata": {
-            "name": meta.name,
-            "exchange": meta.exchange,
-            "tz": meta.tz,
-            "currency": meta.currency,
-            "sector": meta.sector,
-            "country": meta.country,
-        },
-        "ohlcv": {"symbol": meta.symbol, "timeframe": "1d", "tz": meta.tz, "candles": candles},
-        "indicators": {
-            "symbol": meta.symbol,
-            "timeframe": "1d",
-            "rsi14": indicators["rsi14"],
-            "sma": indicators["sma"],
-            "bollinger": indicators["bollinger"],
-            "macd": indicators["macd"],
-        },
-        "forecast": forecast,
-        "insights": insight,
-        "availableRanges": available_ranges(candles),
-    }
-    write_json(sample_symbol_path, sample_payload)
-
     return {
         "meta": meta,
         "indicators": indicators,
-        "forecast": forecast,
-        "insight": insight,
         "dividendYield": dividend_yield,
         "changePct": change_pct,
         "change1m": change_1m,
@@ -668,41 +2800,96 @@ def process_symbol(meta: SymbolMeta) -> Optional[Dict[str, Any]]:
     }
 
 
+def process_symbol(meta: SymbolMeta, incremental: bool = False) -> Optional[Dict[str, Any]]:
+    return analyze_symbol(fetch_symbol(meta, incremental))
+
+
 def fetch_index_snapshot(symbol: str, stooq: str, name: str) -> Optional[Dict[str, Any]]:
     try:
-        csv_text = fetch_csv(stooq)
-    except requests.HTTPError:
+        closes = parse_csv_columns(fetch_csv(stooq)).close[-2:].tolist()
+    except (requests.HTTPError, RuntimeError):
         return None
-    candles = parse_csv(csv_text, None)[-120:]
-    if not candles:
+    if not closes:
         return None
-    latest = candles[-1]
-    previous = candles[-2] if len(candles) > 1 else latest
+    latest = closes[-1]
+    previous = closes[-2] if len(closes) > 1 else latest
     return {
         "symbol": symbol,
         "name": name,
-        "lastClose": latest["close"],
-        "changePct": percent_change(latest["close"], previous["close"]),
+        "lastClose": latest,
+        "changePct": percent_change(latest, previous),
     }
 
 
 def fetch_fx_snapshot(pair: str, stooq: str) -> Optional[Dict[str, Any]]:
     try:
-        csv_text = fetch_csv(stooq)
-    except requests.HTTPError:
+        closes = parse_csv_columns(fetch_csv(stooq)).close[-2:].tolist()
+    except (requests.HTTPError, RuntimeError):
         return None
-    candles = parse_csv(csv_text, None)[-60:]
-    if not candles:
+    if not closes:
         return None
-    latest = candles[-1]
-    previous = candles[-2] if len(candles) > 1 else latest
+    latest = closes[-1]
+    previous = closes[-2] if len(closes) > 1 else latest
     return {
         "pair": pair,
-        "lastClose": latest["close"],
-        "changePct": percent_change(latest["close"], previous["close"]),
+        "lastClose": latest,
+        "changePct": percent_change(latest, previous),
     }
 
 
+def _read_published(*parts: str) -> Any:
+    return json.loads(PUBLISH_DIR.joinpath(*parts).read_text(encoding="utf-8"))
+
+
+def export_samples(
+    symbols_index: List[Dict[str, Any]],
+    market_overview: Dict[str, Any],
+    rankings: Dict[str, Any],
+    only: Optional[List[str]] = None,
+    days: Optional[int] = None,
+) -> int:
+    """
+    Build the frontend demo payloads under SAMPLES_DIR from the published per-symbol JSON.
+    `only` restricts the per-symbol samples to those tickers and `days` keeps just the most
+    recent bars. Returns the number of symbol samples written.
+    """
+    write_json(SAMPLES_DIR / "rankings.json", {
+        "lastUpdated": rankings["lastUpdated"],
+        "gainers": rankings["gainers"],
+        "dividends": rankings["dividends"]
+    })
+    write_json(SAMPLES_DIR / "markets.json", market_overview)
+    write_json(SAMPLES_DIR / "symbols" / "index.json", symbols_index)
+
+    wanted = {symbol.upper() for symbol in only} if only else None
+    exported = 0
+    for entry in symbols_index:
+        symbol = entry["symbol"]
+        if wanted is not None and symbol.upper() not in wanted:
+            continue
+        try:
+            ohlcv = _read_published("symbols", symbol, "ohlcv.json")
+            indicators = _read_published("symbols", symbol, "indicators.json")
+            forecast = _read_published("symbols", symbol, "forecast.json")
+            insight = _read_published("symbols", symbol, "insights.json")
+            meta = _read_published("symbols", symbol, "meta.json")
+        except (OSError, ValueError) as exc:
+            print(f"[warn] no published data to sample for {symbol}: {exc}")
+            continue
+        candles = ohlcv["candles"][-days:] if days else ohlcv["candles"]
+        write_json(SAMPLES_DIR / "symbols" / f"{symbol}.json", {
+            "symbol": symbol,
+            "metadata": {key: meta[key] for key in ("name", "exchange", "tz", "currency", "sector", "country")},
+            "ohlcv": {"symbol": symbol, "timeframe": "1d", "tz": meta["tz"], "candles": candles},
+            "indicators": {key: indicators[key] for key in ("symbol", "timeframe", "rsi14", "sma", "bollinger", "macd")},
+            "forecast": forecast,
+            "insights": insight,
+            "availableRanges": available_ranges(candles),
+        })
+        exported += 1
+    return exported
+
+
 def load_dictionary() -> Any:
     dictionary_path = ROOT / "frontend" / "src" / "data" / "samples" / "indicators" / "index.json"
     if dictionary_path.exists():
@@ -710,49 +2897,382 @@ def load_dictionary() -> Any:
     return []
 
 
-def main() -> None:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    symbol_snapshots: List[Dict[str, Any]] = []
+_WORKER_SETTINGS = ("TODAY", "DATA_DIR", "PUBLISH_DIR", "PRECOMPRESS", "RANGE_MAX_POINTS", "DOWNSAMPLE", "FORECAST_MODEL", "MC_PATHS")
 
-    for meta in UNIVERSE:
-        snapshot = process_symbol(meta)
-        if snapshot:
-            symbol_snapshots.append(snapshot)
 
-    if not symbol_snapshots:
-        raise SystemExit("No symbol data could be generated.")
+def _init_analytics_worker(settings: Dict[str, Any]) -> None:
+    globals().update(settings)
 
-    index_snapshots = [
-        snap for snap in (fetch_index_snapshot(sym, stooq, name) for sym, stooq, name in INDEX_CONFIG) if snap
-    ]
-    fx_snapshots = [
-        snap for snap in (fetch_fx_snapshot(pair, stooq) for pair, stooq in FX_CONFIG) if snap
-    ]
-    rankings = build_rankings(symbol_snapshots)
-    sector_overview = build_sector_overview(symbol_snapshots)
-    market_overview = build_market_overview(symbol_snapshots, index_snapshots, fx_snapshots)
-    symbols_index = build_symbols_index(symbol_snapshots)
-    dictionary = load_dictionary()
-
-    write_json(DATA_DIR / "markets" / "overview.json", market_overview)
-    write_json(DATA_DIR / "sectors" / "overview.json", sector_overview)
-    write_json(DATA_DIR / "rankings" / "top_lists.json", rankings)
-    write_json(DATA_DIR / "rankings" / "top_movers.json", {"lastUpdated": rankings["lastUpdated"], "items": rankings["gainers"]})
-    write_json(DATA_DIR / "rankings" / "dividends.json", {"lastUpdated": rankings["lastUpdated"], "items": rankings["dividends"]})
-    write_json(DATA_DIR / "symbols" / "index.json", symbols_index)
-    write_json(DATA_DIR / "dictionary.json", dictionary)
-
-    sample_rankings_path = SAMPLES_DIR / "rankings.json"
-    write_json(sample_rankings_path, {
-        "lastUpdated": rankings["lastUpdated"],
-        "gainers": rankings["gainers"],
-        "dividends": rankings["dividends"]
-    })
 
-    write_json(SAMPLES_DIR / "markets.json", market_overview)
-    write_json(SAMPLES_DIR / "symbols" / "index.json", symbols_index)
+def analytics_executor(jobs: int) -> Executor:
+    """
+    Process pool for analyze_symbol. Workers are spawned rather than forked because the fetch
+    threads are already running, and they receive the run settings in _WORKER_SETTINGS explicitly.
+    """
+    if jobs <= 1:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_analytics_worker,
+        initargs=({name: globals()[name] for name in _WORKER_SETTINGS},),
+    )
+
+
+def bounded_map(executor: Executor, fn: Callable[[Any], Any], items: Iterable[Any], window: int) -> Iterator[Any]:
+    """Executor.map that submits at most `window` calls ahead of the consumer instead of all of them up front."""
+    pending: deque = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def analyze_in_order(
+    fetched: Iterable[FetchedSymbol],
+    submit: Callable[[FetchedSymbol], Future],
+    symbols: List[str],
+    window: int,
+    completed: Dict[str, Dict[str, Any]],
+    incremental: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Submit fetched symbols for analysis and yield their snapshots strictly in `symbols` order, so the
+    output does not depend on how the pools scheduled the work; `completed` snapshots (resumed from
+    the journal) are yielded in their place. Symbols that need the yfinance fallback are held back and
+    resolved YFINANCE_BATCH at a time. At most about `window` symbols are between fetch and release.
+    """
+    order = deque(symbols)
+    source = iter(fetched)
+    results: Dict[str, Future] = {}
+    deferred: List[FetchedSymbol] = []
+    exhausted = False
+    while order:
+        head = order[0]
+        if head in completed:
+            order.popleft()
+            yield completed.pop(head)
+            continue
+        future = results.get(head)
+        backlog = len(results) + len(deferred) >= window
+        if future is not None and (future.done() or backlog or exhausted):
+            order.popleft()
+            del results[head]
+            snapshot = future.result()
+            if snapshot:
+                yield snapshot
+            continue
+        if deferred and (exhausted or len(deferred) >= YFINANCE_BATCH or (future is None and backlog)):
+            print(f"[info] fetching {len(deferred)} symbols from yfinance")
+            for item in resolve_fallbacks(deferred, incremental):
+                results[item.meta.symbol] = submit(item)
+            deferred = []
+            continue
+        if exhausted:
+            raise RuntimeError(f"no fetch result for {head}")
+        item = next(source, None)
+        if item is None:
+            exhausted = True
+        elif item.needs_fallback:
+            deferred.append(item)
+        else:
+            results[item.meta.symbol] = submit(item)
+
+
+def write_run_report(run_metrics: RunMetrics, started: datetime, wall_seconds: float, symbol_count: int) -> None:
+    """Publish the run's metrics as data/run_report.json plus a Prometheus textfile next to it."""
+    report = {
+        "startedAt": started.isoformat(),
+        "finishedAt": datetime.now(timezone.utc).isoformat(),
+        "wallSeconds": wall_seconds,
+        "symbols": symbol_count,
+        **run_metrics.to_dict(),
+    }
+    write_json(DATA_DIR / "run_report.json", report)
+    prometheus = run_metrics.to_prometheus()
+    prometheus += f"# TYPE tickervista_run_wall_seconds gauge\ntickervista_run_wall_seconds {wall_seconds:.6f}\n"
+    prometheus += f"# TYPE tickervista_run_symbols gauge\ntickervista_run_symbols {symbol_count}\n"
+    _write_atomic(DATA_DIR / "run_report.prom", prometheus.encode("utf-8"))
+
+
+def _shard_arg(text: str) -> Tuple[int, int]:
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {text!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be within 0..N-1, got {text!r}")
+    return index, count
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="tickervista-fetch", description="Generate TickerVista JSON data.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=_env_int("TICKERVISTA_WORKERS", DEFAULT_WORKERS),
+        help="number of symbols fetched concurrently (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=_env_int("TICKERVISTA_JOBS", os.cpu_count() or 1),
+        help="processes for indicator computation and JSON serialization (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--universe",
+        default=UNIVERSE_SOURCE,
+        help='symbol universe: "remote", "snapshot", "base" or a CSV/JSON file path (default: %(default)s)',
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="bypass the on-disk response cache under data/cache/http",
+    )
+    parser.add_argument(
+        "--precompress",
+        nargs="+",
+        choices=("gz", "br"),
+        default=[],
+        help="also write .json.gz / .json.br siblings of every JSON file (br needs the brotli package)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only download bars newer than the stored ohlcv.json and append them",
+    )
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        default=RANGE_MAX_POINTS,
+        help="upper bound on candles per precomputed chart range (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--downsample",
+        choices=("minmax", "lttb", "none"),
+        default=DOWNSAMPLE,
+        help="how chart ranges longer than --max-points are thinned (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--forecast",
+        choices=("cone", "gbm", "bootstrap"),
+        default=FORECAST_MODEL,
+        help="model behind forecast.json: drift + volatility cone or a Monte Carlo (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--mc-paths",
+        type=int,
+        default=MC_PATHS,
+        help="simulated paths per symbol for the Monte Carlo models (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--export-samples",
+        nargs="*",
+        metavar="SYMBOL",
+        help="after the run, write the frontend demo payloads under frontend/src/data/samples "
+        "(all symbols, or only the ones listed)",
+    )
+    parser.add_argument(
+        "--sample-days",
+        type=int,
+        metavar="DAYS",
+        help="keep only the most recent DAYS bars in exported symbol samples",
+    )
+    parser.add_argument(
+        "--generations",
+        type=int,
+        default=_env_int("TICKERVISTA_GENERATIONS", 0),
+        metavar="KEEP",
+        help="write into data/generations/<run>, switch data/CURRENT at the end and keep KEEP generations "
+        "(default: %(default)s = write in place)",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="ignore the journal of an unfinished run from today and fetch every symbol again",
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="re-publish the generation before the current one and exit",
+    )
+    parser.add_argument(
+        "--shard",
+        type=_shard_arg,
+        default=os.getenv("TICKERVISTA_SHARD") or None,
+        metavar="i/N",
+        help="process only the symbols hashed to shard i of N and write data/shards/<i>-of-<N>.json "
+        "for tickervista-merge instead of the aggregate files",
+    )
+    return parser.parse_args(argv)
 
-    print(f"Generated data for {len(symbol_snapshots)} symbols in {DATA_DIR}")
+
+def parse_merge_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="tickervista-merge", description="Combine tickervista-fetch --shard partials into the aggregate JSON."
+    )
+    parser.add_argument(
+        "partials",
+        nargs="*",
+        type=Path,
+        metavar="PARTIAL",
+        help="shard partial files (default: every data/shards/<i>-of-<N>.json)",
+    )
+    parser.add_argument(
+        "--precompress",
+        nargs="+",
+        choices=("gz", "br"),
+        default=[],
+        help="also write .json.gz / .json.br siblings of every JSON file (br needs the brotli package)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    global HTTP_CACHE_ENABLED, PRECOMPRESS, PUBLISH_DIR, RANGE_MAX_POINTS, DOWNSAMPLE, FORECAST_MODEL, MC_PATHS
+    args = parse_args(argv)
+    if args.rollback:
+        print(f"Rolled back to generation {rollback_generation().name}")
+        return
+    if "br" in args.precompress and brotli is None:
+        raise SystemExit("--precompress br requires the brotli package (pip install brotli)")
+    if args.shard is not None and (args.generations > 0 or args.export_samples is not None):
+        raise SystemExit("--shard cannot be combined with --generations or --export-samples")
+    HTTP_CACHE_ENABLED = not args.no_http_cache
+    PRECOMPRESS = tuple(args.precompress)
+    RANGE_MAX_POINTS = max(3, args.max_points)
+    DOWNSAMPLE = args.downsample
+    FORECAST_MODEL = args.forecast
+    MC_PATHS = max(1, args.mc_paths)
+    started = datetime.now(timezone.utc)
+    run_clock = time.perf_counter()
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    quota = QuotaLedger(quota_path(), RATE_LIMITS)
+    quota.attach()
+    journal = RunJournal(journal_path(args.shard))
+    resume_dir, completed = journal.resume(args.generations > 0, discard=args.no_resume)
+    if args.generations > 0:
+        PUBLISH_DIR = resume_dir or start_generation(started)
+    else:
+        PUBLISH_DIR = DATA_DIR
+    journal.start(PUBLISH_DIR, resuming=bool(completed))
+    universe = get_universe(args.universe)
+    print(f"[info] symbol universe size: {len(universe)}")
+    # With --shard only shard 0 spends the Alpha Vantage quota, on the whole universe; running the
+    # merge next to it lets its fundamentals store supply the freshest yields.
+    refresh_symbols = [meta.symbol for meta in universe]
+    aggregates: Any = UniverseAggregates()
+    if args.shard is not None:
+        shard, shards = args.shard
+        aggregates = ShardPartial(shard, shards, {meta.symbol: position for position, meta in enumerate(universe)})
+        universe = [meta for meta in universe if shard_of(meta.symbol, shards) == shard]
+        refresh_symbols = refresh_symbols if shard == 0 else []
+        print(f"[info] shard {shard}/{shards}: {len(universe)} symbols")
+    remaining = [meta for meta in universe if meta.symbol not in completed]
+    if len(remaining) < len(universe):
+        print(f"[info] resuming: {len(universe) - len(remaining)} symbols already completed today")
+        RUN_METRICS.add("journalResumed", len(universe) - len(remaining))
+    workers = max(1, args.workers)
+
+    fundamentals = FundamentalsStore(fundamentals_path())
+    stop_refresh = threading.Event()
+    refresher = threading.Thread(
+        target=refresh_fundamentals,
+        args=(fundamentals, refresh_symbols, stop_refresh),
+        name="fundamentals",
+        daemon=True,
+    )
+    refresher.start()
+    window = 4 * max(workers, args.jobs)
+    with ThreadPoolExecutor(max_workers=workers) as executor, analytics_executor(args.jobs) as analysts:
+        fetched = bounded_map(
+            executor,
+            lambda meta: fetch_symbol(
+                meta, incremental=args.incremental, defer_fallback=True, fundamentals=fundamentals
+            ),
+            remaining,
+            window,
+        )
+        snapshots = analyze_in_order(
+            fetched,
+            lambda item: journal.watch(analysts.submit(analyze_symbol, item)),
+            [meta.symbol for meta in universe],
+            window,
+            completed,
+            incremental=args.incremental,
+        )
+        # Each snapshot goes into the aggregate builders as soon as it is released and is then dropped.
+        for snapshot in snapshots:
+            collector = snapshot.pop("metrics", None)
+            if collector is not None:
+                RUN_METRICS.merge(collector)
+            aggregates.add(snapshot)
+
+        if not len(aggregates) and args.shard is None:
+            raise SystemExit("No symbol data could be generated.")
+
+        index_snapshots: List[Dict[str, Any]] = []
+        fx_snapshots: List[Dict[str, Any]] = []
+        if args.shard is None or args.shard[0] == 0:
+            index_snapshots = [
+                snap for snap in executor.map(lambda cfg: fetch_index_snapshot(*cfg), INDEX_CONFIG) if snap
+            ]
+            fx_snapshots = [snap for snap in executor.map(lambda cfg: fetch_fx_snapshot(*cfg), FX_CONFIG) if snap]
+    # Whatever quota is left stays for the next run; values refreshed so far replace the ones read at fetch time.
+    stop_refresh.set()
+    refresher.join()
+    quota.save(force=True)
+    pruned_entries, pruned_blobs = prune_http_cache()
+    if pruned_entries or pruned_blobs:
+        print(f"[info] pruned {pruned_entries} expired cache entries and {pruned_blobs} unreferenced blobs")
+
+    if args.shard is not None:
+        partial = aggregates.write(index_snapshots, fx_snapshots, fundamentals)
+        journal.finish()
+        write_run_report(RUN_METRICS, started, time.perf_counter() - run_clock, len(aggregates))
+        print(f"Generated data for {len(aggregates)} symbols in {PUBLISH_DIR}; merge input written to {partial}")
+        return
+
+    symbols_index, market_overview, rankings = aggregates.publish(index_snapshots, fx_snapshots, fundamentals)
+    if args.export_samples is not None:
+        with RUN_METRICS.timer("export_samples"):
+            exported = export_samples(
+                symbols_index, market_overview, rankings, only=args.export_samples or None, days=args.sample_days
+            )
+        print(f"[info] exported {exported} symbol samples to {SAMPLES_DIR}")
+
+    if PUBLISH_DIR != DATA_DIR:
+        publish_generation(PUBLISH_DIR)
+        for path in gc_generations(args.generations):
+            print(f"[info] removed old generation {path.name}")
+    elif unpublish_generations():
+        print("[info] removed data/CURRENT: readers use the in-place data again")
+    journal.finish()
+    write_run_report(RUN_METRICS, started, time.perf_counter() - run_clock, len(aggregates))
+    print(f"Generated data for {len(aggregates)} symbols in {PUBLISH_DIR}")
+
+
+def merge_main(argv: Optional[List[str]] = None) -> None:
+    """tickervista-merge: build the aggregate JSON from the partials of a --shard run, without touching candles."""
+    global PRECOMPRESS, PUBLISH_DIR
+    args = parse_merge_args(argv)
+    if "br" in args.precompress and brotli is None:
+        raise SystemExit("--precompress br requires the brotli package (pip install brotli)")
+    PRECOMPRESS = tuple(args.precompress)
+    PUBLISH_DIR = DATA_DIR
+    paths = args.partials or sorted(shards_dir().glob("*-of-*.json"))
+    snapshots, index_snapshots, fx_snapshots = read_shard_partials(paths)
+    aggregates = UniverseAggregates()
+    for snapshot in snapshots:
+        aggregates.add(snapshot)
+    if not len(aggregates):
+        raise SystemExit("No symbol data could be generated.")
+    aggregates.publish(index_snapshots, fx_snapshots, FundamentalsStore(fundamentals_path()))
+    if unpublish_generations():
+        print("[info] removed data/CURRENT: readers use the in-place data again")
+    print(f"Merged {len(paths)} shard partials: {len(aggregates)} symbols in {PUBLISH_DIR}")
 
 
 if __name__ == "__main__":
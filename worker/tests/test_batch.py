@@ -0,0 +1,74 @@
+"""Rows of the batched (symbols x days) analytics against the per-symbol computation."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+import fetch_market_data as fm
+
+TOLERANCE = 1e-9
+
+
+def _candles(length: int, seed: int) -> List[Dict[str, Any]]:
+    meta = fm.SymbolMeta(
+        symbol=f"B{seed}",
+        stooq=f"b{seed}.us",
+        name=f"Batch {seed}",
+        exchange="NYSE",
+        currency="USD",
+        tz="America/New_York",
+        sector="Tech",
+        country="US",
+        dividend_yield=0.5,
+    )
+    return fm.generate_synthetic_candles(meta, days=length)
+
+
+# Ragged on purpose: empty, single-bar, shorter than every window, and longer than all of them.
+LENGTHS = [0, 1, 2, 14, 15, 21, 22, 49, 60, 61, 200, 400]
+
+
+@pytest.mark.parametrize("chunk", [3, fm.UNIVERSE_CHUNK])
+def test_rows_match_per_symbol_results(chunk: int) -> None:
+    candle_lists = [_candles(length, seed) for seed, length in enumerate(LENGTHS)]
+    analytics = fm.universe_analytics(*fm.stack_candles(candle_lists), chunk=chunk)
+    for row, candles in enumerate(candle_lists):
+        if not candles:
+            assert not analytics["valid"][row]
+            continue
+        assert analytics["valid"][row]
+        closes = [candle["close"] for candle in candles]
+        scale = max(closes)
+        expected = fm.compute_indicators(candles)
+        actual = fm.analytics_indicators(analytics, row)
+        assert actual["lastClose"] == expected["lastClose"]
+        for group in ("sma", "bollinger", "macd"):
+            for key, value in expected[group].items():
+                assert abs(actual[group][key] - value) <= TOLERANCE * scale, (row, key)
+        assert abs(actual["rsi14"] - expected["rsi14"]) <= TOLERANCE * 100, row
+
+        previous = closes[-2] if len(closes) > 1 else closes[-1]
+        month = closes[max(len(closes) - 21, 0)]
+        change_pct = fm.percent_change(closes[-1], previous)
+        change_1m = fm.percent_change(closes[-1], month)
+        assert abs(analytics["changePct"][row] - change_pct) <= TOLERANCE
+        assert abs(analytics["change1m"][row] - change_1m) <= TOLERANCE
+        assert analytics["lastVolume"][row] == candles[-1]["volume"]
+
+        drift, volatility = fm.return_stats(np.array(closes))
+        assert abs(analytics["drift"][row] - drift) <= TOLERANCE
+        assert abs(analytics["volatility"][row] - volatility) <= TOLERANCE
+        assert analytics["trafficLight"][row] == fm.traffic_light_score(expected)
+
+
+def test_batch_snapshots_skip_empty_histories() -> None:
+    metas = [replace(fm.BASE_UNIVERSE[0], symbol=f"S{idx}") for idx in range(3)]
+    candle_lists = [_candles(30, 1), [], _candles(5, 2)]
+    snapshots = fm.batch_snapshots(metas, candle_lists)
+    assert [snapshot["meta"].symbol for snapshot in snapshots] == ["S0", "S2"]
+    assert snapshots[1]["latest"] == candle_lists[2][-1]
+    assert snapshots[1]["dividendYield"] == metas[2].dividend_yield
@@ -0,0 +1,129 @@
+"""Incremental indicator updates through the on-disk store against a full recompute."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pytest
+
+import fetch_market_data as fm
+
+TOLERANCE = 1e-9
+SYMBOL = "INC"
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(fm, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(fm, "RUN_METRICS", fm.RunMetrics())
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def history() -> fm.CandleColumns:
+    candles = fm.generate_synthetic_candles(fm.BASE_UNIVERSE[0], days=700)
+    return fm.CandleColumns.from_candles(candles, "stooq")
+
+
+def _window(columns: fm.CandleColumns, start: int, end: int) -> fm.CandleColumns:
+    return fm.CandleColumns.from_candles(
+        columns.to_candles(SYMBOL)[start:end], columns.source
+    )
+
+
+def _assert_matches_full(
+    series: Dict[str, np.ndarray], columns: fm.CandleColumns
+) -> None:
+    expected = fm.indicator_series(np.asarray(columns.close, dtype=np.float64))
+    scale = float(np.max(columns.close))
+    for name, values in expected.items():
+        assert len(series[name]) == len(values), name
+        assert np.max(np.abs(series[name] - values)) <= TOLERANCE * scale, name
+
+
+def _counter(name: str) -> float:
+    return sum(
+        value for (key, _), value in fm.RUN_METRICS.counters.items() if key == name
+    )
+
+
+def test_daily_bars_are_appended(history: fm.CandleColumns) -> None:
+    fm.update_indicator_series(SYMBOL, _window(history, 0, 600))
+    for end in range(601, 611):
+        columns = _window(history, 0, end)
+        written = _counter("bytesWritten")
+        _assert_matches_full(fm.update_indicator_series(SYMBOL, columns), columns)
+        # One row per series plus ts: nothing else is rewritten.
+        assert _counter("bytesWritten") - written == 8 * (len(fm.INDICATOR_NAMES) + 1)
+    assert _counter("indicatorRecomputes") == 1
+    assert _counter("indicatorBarsAppended") == 10
+
+
+def test_several_new_bars_and_unchanged_rerun(history: fm.CandleColumns) -> None:
+    fm.update_indicator_series(SYMBOL, _window(history, 0, 500))
+    columns = _window(history, 0, 537)
+    _assert_matches_full(fm.update_indicator_series(SYMBOL, columns), columns)
+    _assert_matches_full(fm.update_indicator_series(SYMBOL, columns), columns)
+    assert _counter("indicatorRecomputes") == 1
+
+
+def test_sliding_window_and_compaction(
+    history: fm.CandleColumns, monkeypatch: pytest.MonkeyPatch, data_dir: Path
+) -> None:
+    # The candle store keeps a trailing window, so the series no longer starts at the first bar.
+    monkeypatch.setattr(fm, "INDICATOR_STORE_MAX_ROWS", 420)
+    fm.update_indicator_series(SYMBOL, _window(history, 0, 300))
+    for end in range(320, 700, 20):
+        start = end - 300
+        columns = _window(history, start, end)
+        series = fm.update_indicator_series(SYMBOL, columns)
+        expected = fm.indicator_series(
+            np.asarray(history.close[:end], dtype=np.float64)
+        )
+        scale = float(np.max(history.close[:end]))
+        for name, values in expected.items():
+            assert np.max(np.abs(series[name] - values[start:])) <= TOLERANCE * scale
+        rows = (data_dir / "symbols" / SYMBOL / "indicators" / "ts.bin").stat().st_size
+        assert rows // 8 <= 420
+    assert _counter("indicatorRecomputes") == 1
+
+
+def test_revised_history_is_recomputed(history: fm.CandleColumns) -> None:
+    fm.update_indicator_series(SYMBOL, _window(history, 0, 400))
+    candles = history.to_candles(SYMBOL)[:410]
+    candles[395] = {**candles[395], "close": candles[395]["close"] * 1.1}
+    columns = fm.CandleColumns.from_candles(candles, "stooq")
+    _assert_matches_full(fm.update_indicator_series(SYMBOL, columns), columns)
+    assert _counter("indicatorRecomputes") == 2
+
+
+def test_interrupted_append_is_overwritten(
+    history: fm.CandleColumns, data_dir: Path
+) -> None:
+    fm.update_indicator_series(SYMBOL, _window(history, 0, 400))
+    store = data_dir / "symbols" / SYMBOL / "indicators"
+    # Bytes written past the committed row count by an append that never reached state.json.
+    for path in store.glob("*.bin"):
+        with open(path, "ab") as handle:
+            handle.write(b"\xff" * 24)
+    columns = _window(history, 0, 402)
+    _assert_matches_full(fm.update_indicator_series(SYMBOL, columns), columns)
+    assert (store / "ts.bin").stat().st_size == 8 * 402
+    assert _counter("indicatorRecomputes") == 1
+
+
+def test_legacy_npy_store_is_replaced(
+    history: fm.CandleColumns, data_dir: Path
+) -> None:
+    store = data_dir / "symbols" / SYMBOL / "indicators"
+    store.mkdir(parents=True)
+    np.save(store / "ts.npy", history.ts[:10])
+    (store / "state.json").write_text(
+        '{"ts": 0, "tail": [], "ema12": 0, "ema26": 0, "signal": 0}'
+    )
+    columns = _window(history, 0, 300)
+    _assert_matches_full(fm.update_indicator_series(SYMBOL, columns), columns)
+    assert not list(store.glob("*.npy"))
+    assert _counter("indicatorRecomputes") == 1
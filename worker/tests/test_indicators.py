@@ -0,0 +1,157 @@
+"""
+The NumPy indicator engine against the per-element Python loops it replaced. indicator_series
+documents agreement within 1e-9 of the price scale (100 for RSI); these tests hold it to that.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+import fetch_market_data as fm
+
+TOLERANCE = 1e-9
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def _stddev(values: List[float]) -> float:
+    if not values:
+        return 0.0
+    avg = _mean(values)
+    return math.sqrt(sum((value - avg) ** 2 for value in values) / len(values))
+
+
+def _ema(values: List[float], period: int) -> List[float]:
+    if not values:
+        return []
+    k = 2 / (period + 1)
+    out = [values[0]]
+    for value in values[1:]:
+        out.append(value * k + out[-1] * (1 - k))
+    return out
+
+
+def scalar_indicators(closes: List[float]) -> Dict[str, float]:
+    """The former compute_indicators, flattened to the indicator_series names."""
+    window = closes[-20:]
+    middle, spread = _mean(window), _stddev(window) * 2
+    deltas = [closes[idx] - closes[idx - 1] for idx in range(1, len(closes))]
+    avg_gain = _mean([max(delta, 0) for delta in deltas][-14:])
+    avg_loss = _mean([max(-delta, 0) for delta in deltas][-14:])
+    macd = [fast - slow for fast, slow in zip(_ema(closes, 12), _ema(closes, 26))]
+    signal = _ema(macd, 9)
+    return {
+        "sma20": middle,
+        "sma50": _mean(closes[-50:]),
+        "bbUpper": middle + spread,
+        "bbMiddle": middle,
+        "bbLower": middle - spread,
+        "rsi14": 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss),
+        "macd": macd[-1],
+        "signal": signal[-1],
+        "histogram": macd[-1] - signal[-1],
+    }
+
+
+def scalar_return_stats(closes: List[float]) -> tuple[float, float]:
+    """The former returns loop in compute_forecast."""
+    returns = [
+        (closes[idx] - closes[idx - 1]) / closes[idx - 1]
+        for idx in range(1, len(closes))
+        if closes[idx - 1] != 0
+    ]
+    recent = returns[-60:]
+    return _mean(recent), _stddev(recent)
+
+
+def _assert_close(actual: float, expected: float, scale: float, label: Any) -> None:
+    assert abs(actual - expected) <= TOLERANCE * scale, (label, actual, expected)
+
+
+def _walk(days: int, seed: int, start: float = 100.0) -> List[float]:
+    rng = random.Random(seed)
+    closes, price = [], start
+    for _ in range(days):
+        price = max(0.01, price * (1 + rng.uniform(-0.04, 0.04)))
+        closes.append(round(price, 2))
+    return closes
+
+
+HISTORIES = {
+    "long": _walk(800, 1),
+    "penny": _walk(300, 2, start=0.5),
+    "large": _walk(300, 3, start=45_000.0),
+    "flat": [42.0] * 60,
+    "rising": [float(value) for value in range(1, 40)],
+    "with_zero": [10.0, 0.0, 12.0, 11.5, 0.0, 13.0, 12.5] * 5,
+}
+
+
+@pytest.mark.parametrize("name", sorted(HISTORIES))
+def test_series_match_scalar_loops_at_every_bar(name: str) -> None:
+    closes = HISTORIES[name]
+    series = fm.indicator_series(np.array(closes))
+    scale = max(max(abs(value) for value in closes), 1.0)
+    for end in range(1, len(closes) + 1):
+        expected = scalar_indicators(closes[:end])
+        for key, value in expected.items():
+            _assert_close(
+                float(series[key][end - 1]),
+                value,
+                100.0 if key == "rsi14" else scale,
+                (name, end, key),
+            )
+
+
+@pytest.mark.parametrize("length", [1, 2, 14, 15, 20, 26, 50, 51, 130])
+def test_compute_indicators_short_histories(length: int) -> None:
+    closes = _walk(length, length)
+    candles = [{"close": close} for close in closes]
+    indicators = fm.compute_indicators(candles)
+    expected = scalar_indicators(closes)
+    flat = {
+        "rsi14": indicators["rsi14"],
+        **indicators["sma"],
+        "bbUpper": indicators["bollinger"]["upper"],
+        "bbMiddle": indicators["bollinger"]["middle"],
+        "bbLower": indicators["bollinger"]["lower"],
+        **indicators["macd"],
+    }
+    scale = max(closes)
+    for key, value in expected.items():
+        _assert_close(flat[key], value, 100.0 if key == "rsi14" else scale, key)
+    assert indicators["lastClose"] == closes[-1]
+
+
+@pytest.mark.parametrize("name", sorted(HISTORIES))
+def test_return_stats_match_scalar_loop(name: str) -> None:
+    closes = HISTORIES[name]
+    drift, volatility = fm.return_stats(np.array(closes))
+    expected_drift, expected_volatility = scalar_return_stats(closes)
+    _assert_close(drift, expected_drift, 1.0, "drift")
+    _assert_close(volatility, expected_volatility, 1.0, "volatility")
+
+
+def test_forecast_bands_follow_return_stats() -> None:
+    closes = HISTORIES["long"]
+    forecast = fm.compute_forecast("T", [{"close": close} for close in closes])
+    drift, volatility = scalar_return_stats(closes)
+    assert len(forecast["bands"]) == forecast["horizonDays"] == 30
+    for band in forecast["bands"]:
+        mid = closes[-1] * (1 + drift) ** band["step"]
+        spread = mid * volatility * math.sqrt(band["step"])
+        _assert_close(band["mid"], mid, closes[-1], band["step"])
+        _assert_close(band["lower"], mid - spread, closes[-1], band["step"])
+        _assert_close(band["upper"], mid + spread, closes[-1], band["step"])
+
+
+def test_empty_history() -> None:
+    assert fm.compute_indicators([])["lastClose"] == 0.0
+    assert fm.compute_forecast("T", [])["bands"] == []
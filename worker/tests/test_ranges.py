@@ -0,0 +1,53 @@
+"""Precomputed chart range slices when a symbol's history changes between runs."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+import fetch_market_data as fm
+
+META = fm.BASE_UNIVERSE[0]
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(fm, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(fm, "PUBLISH_DIR", tmp_path)
+    monkeypatch.setattr(fm, "PRECOMPRESS", ("gz",))
+    return tmp_path
+
+
+def _by_timeframe(days: int) -> Dict[str, fm.CandleColumns]:
+    candles = fm.generate_synthetic_candles(META, days=days)
+    columns = fm.CandleColumns.from_candles(candles, "stooq")
+    return {
+        "1d": columns,
+        **{
+            timeframe: fm.resample_columns(columns, timeframe)
+            for timeframe in fm.TIMEFRAMES
+        },
+    }
+
+
+def test_ranges_the_shorter_history_misses_are_removed(data_dir: Path) -> None:
+    ranges_dir = data_dir / "symbols" / META.symbol / "ranges"
+    long_manifest = fm.write_range_slices(
+        META, "stooq", _by_timeframe(4000), ranges_dir
+    )
+    assert {entry["range"] for entry in long_manifest["ranges"]} == set(fm.CHART_RANGES)
+    assert (ranges_dir / "10Y.json.gz").exists()
+
+    short_manifest = fm.write_range_slices(
+        META, "synthetic", _by_timeframe(800), ranges_dir
+    )
+    covered = {entry["range"] for entry in short_manifest["ranges"]}
+    assert covered == {"1M", "3M", "6M", "1Y", "2Y"}
+    on_disk = {path.name.partition(".")[0] for path in ranges_dir.iterdir()}
+    assert on_disk == covered
+    for name in covered:
+        payload = json.loads((ranges_dir / f"{name}.json").read_text(encoding="utf-8"))
+        assert payload["source"] == "synthetic"
@@ -0,0 +1,129 @@
+"""Partial-selection rankings against the full stable sorts they replaced."""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import replace
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+import fetch_market_data as fm
+
+SECTORS = ["Technology", "Energy", "Financials", "Health Care"]
+COUNTRIES = ["US", "JP"]
+
+
+def _snapshots(count: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    template = fm.BASE_UNIVERSE[0]
+    snapshots = []
+    for idx in range(count):
+        snapshots.append(
+            {
+                "meta": replace(
+                    template,
+                    symbol=f"R{idx:04d}",
+                    sector=SECTORS[idx % len(SECTORS)],
+                    country=COUNTRIES[idx % len(COUNTRIES)],
+                ),
+                # Coarse values so ties are common; ties must keep input order.
+                "changePct": rng.choice([-2.0, -0.5, 0.0, 0.5, 1.0, 3.0]),
+                "change1m": round(rng.uniform(-10, 10), 1),
+                "dividendYield": rng.choice([0.0, 0.0, 1.5, 2.5, 4.0]),
+                "latest": {"volume": rng.randint(0, 5) * 1000},
+                "indicators": {
+                    "rsi14": rng.choice([30.0, 50.0, 70.0, 100.0]),
+                    "lastClose": round(rng.uniform(5, 500), 2),
+                },
+            }
+        )
+    return snapshots
+
+
+def _reference_list(snapshots, metric: str, side: str, k: int) -> List[str]:
+    getter = fm._RANKING_GETTERS[metric]
+    # sorted(reverse=True) keeps ties in input order, as the ranking lists must.
+    ordered = sorted(snapshots, key=getter, reverse=side == "top")
+    return [snapshot["meta"].symbol for snapshot in ordered[:k]]
+
+
+@pytest.mark.parametrize("count", [0, 1, 7, 150, 1200])
+def test_lists_match_full_sorts(count: int) -> None:
+    snapshots = _snapshots(count, count)
+    rankings = fm.build_rankings(fm.RankingColumns.from_snapshots(snapshots))
+    for name, (metric, side, k) in fm.RANKING_LISTS.items():
+        items = rankings[name]
+        assert [item["symbol"] for item in items] == _reference_list(
+            snapshots, metric, side, k
+        ), name
+        assert [item["rank"] for item in items] == list(range(1, len(items) + 1))
+
+
+def test_original_payloads_are_unchanged() -> None:
+    snapshots = _snapshots(300, 3)
+    rankings = fm.build_rankings(fm.RankingColumns.from_snapshots(snapshots))
+    gainers = sorted(snapshots, key=lambda s: s["changePct"], reverse=True)[:20]
+    dividends = sorted(
+        snapshots, key=lambda s: s.get("dividendYield", 0), reverse=True
+    )[:100]
+    for items, expected, metric in (
+        (rankings["gainers"], gainers, "changePct"),
+        (rankings["dividends"], dividends, "dividendYield"),
+    ):
+        assert items == [
+            {
+                "rank": idx + 1,
+                "symbol": snapshot["meta"].symbol,
+                "name": snapshot["meta"].name,
+                "exchange": snapshot["meta"].exchange,
+                metric: snapshot[metric],
+                "lastPrice": snapshot["indicators"]["lastClose"],
+            }
+            for idx, snapshot in enumerate(expected)
+        ]
+
+
+def test_group_movers_match_per_group_sorts() -> None:
+    snapshots = _snapshots(400, 4)
+    movers = fm.build_group_movers(fm.RankingColumns.from_snapshots(snapshots))
+    for key, attribute in (("bySector", "sector"), ("byCountry", "country")):
+        labels = sorted({getattr(snap["meta"], attribute) for snap in snapshots})
+        assert sorted(movers[key]) == labels
+        for label in labels:
+            members = [s for s in snapshots if getattr(s["meta"], attribute) == label]
+            for side, top in (("gainers", True), ("losers", False)):
+                ordered = sorted(members, key=lambda s: s["changePct"], reverse=top)
+                expected = [s["meta"].symbol for s in ordered[: fm.GROUP_MOVERS_K]]
+                assert [item["symbol"] for item in movers[key][label][side]] == expected
+
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_top_k_indices_with_ties_and_nan(largest: bool) -> None:
+    rng = np.random.default_rng(5)
+    values = rng.integers(0, 6, size=500).astype(np.float64)
+    values[rng.choice(500, size=40, replace=False)] = np.nan
+    keyed = [
+        (math.inf if math.isnan(value) else (-value if largest else value), idx)
+        for idx, value in enumerate(values.tolist())
+    ]
+    expected = [idx for _, idx in sorted(keyed)]
+    for k in (0, 1, 5, 37, 460, 500, 600):
+        assert fm.top_k_indices(values, k, largest).tolist() == expected[:k]
+
+
+def test_percentile_ranks_match_brute_force() -> None:
+    snapshots = _snapshots(250, 6)
+    arrays = fm.RankingColumns.from_snapshots(snapshots).arrays()
+    ranks = fm.percentile_ranks(arrays)
+    for metric in fm.RANKING_METRICS:
+        values = arrays[metric].tolist()
+        for row, value in enumerate(values):
+            above = sum(other > value for other in values)
+            below = sum(other < value for other in values)
+            ties = sum(other == value for other in values)
+            assert ranks[metric]["rank"][row] == above + 1
+            expected = (below + ties / 2) / len(values) * 100
+            assert ranks[metric]["percentile"][row] == pytest.approx(expected)
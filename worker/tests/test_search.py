@@ -0,0 +1,92 @@
+"""search_symbols over symbols/search_index.json against a linear scan of symbols/index.json."""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+import fetch_market_data as fm
+
+WORDS = [
+    "Apple",
+    "Applied",
+    "Maple",
+    "Capital",
+    "Japan",
+    "Tech",
+    "Energy",
+    "Bank",
+    "Motor",
+]
+KANA = ["トヨタ", "ソニー", "キヤノン", "ニッポン", "ほんだ", "みずほ"]
+SECTORS = ["Technology", "Energy", "Financials", "Consumer Cyclical", "情報・通信業"]
+
+
+def _symbols_index(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(20)
+    items = []
+    for idx in range(count):
+        if idx % 5 == 0:
+            symbol = f"{1000 + idx}.T"
+            name = f"{rng.choice(KANA)}{rng.choice(['自動車', '銀行', 'ホールディングス'])}"
+        else:
+            symbol = "".join(
+                rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+                for _ in range(rng.randint(1, 5))
+            )
+            name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} Inc."
+        items.append(
+            {
+                "id": idx + 1,
+                "symbol": symbol,
+                "name": name,
+                "sector": rng.choice(SECTORS),
+            }
+        )
+    # Fields shorter than a trigram, and missing ones.
+    items.append({"id": count + 1, "symbol": "A", "name": "AP", "sector": None})
+    return items
+
+
+def _linear(symbols_index: List[Dict[str, Any]], query: str) -> List[int]:
+    needle = fm.normalize_search_text(query.strip())
+    return [
+        entry_id
+        for entry_id, item in enumerate(symbols_index)
+        if any(
+            needle in fm.normalize_search_text(item.get(key) or "")
+            for key in ("symbol", "name", "sector")
+        )
+    ]
+
+
+SYMBOLS_INDEX = _symbols_index(3000)
+SEARCH_INDEX = fm.build_search_index(SYMBOLS_INDEX)
+QUERIES = [
+    "", " ", "a", "ap", "AP", "p", "le", "e ", "7", "10", "1005", ".t", "t",
+    "app", "apple", "ple inc", "maple capital", "zzz", "technology", "ene",
+    "トヨタ", "とよた", "ﾄﾖﾀ", "ほ", "ホン", "自動", "銀", "情報", "ＡＰＰ", "ａｐ",
+]  # fmt: skip
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_index_matches_linear_scan(query: str) -> None:
+    assert fm.search_symbols(SEARCH_INDEX, query) == _linear(SYMBOLS_INDEX, query)
+
+
+def test_short_queries_match_substrings() -> None:
+    # "ap" inside "Maple", "Capital" and "Japan", not only as a token prefix.
+    ids = fm.search_symbols(SEARCH_INDEX, "ap")
+    names = {SYMBOLS_INDEX[entry_id]["name"] for entry_id in ids}
+    assert any(name.startswith(("Maple", "Capital", "Japan")) for name in names)
+
+
+def test_random_substrings_of_indexed_text() -> None:
+    rng = random.Random(7)
+    for _ in range(300):
+        text = rng.choice(SEARCH_INDEX["texts"]).replace("\n", "")
+        start = rng.randrange(len(text))
+        query = text[start : start + rng.randint(1, 6)]
+        assert fm.search_symbols(SEARCH_INDEX, query) == _linear(SYMBOLS_INDEX, query)
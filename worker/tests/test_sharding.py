@@ -0,0 +1,122 @@
+"""
+Sharded runs against a stubbed fetcher: three `--shard i/3` processes plus tickervista-merge must
+publish the same aggregate files as one unsharded run.
+
+The module doubles as the driver for those processes: `python test_sharding.py DATA_DIR run ARGS...`
+runs main() and `... DATA_DIR merge` runs merge_main(), both with fetch_csv answering from
+synthetic candles.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+import bench_worker
+import fetch_market_data as fm
+
+WORKER_DIR = Path(__file__).resolve().parent.parent
+SYMBOLS = 40
+DAYS = 400
+AGGREGATES = [
+    "markets",
+    "sectors",
+    "rankings",
+    "symbols/index.json",
+    "symbols/search_index.json",
+]
+
+
+def _stubbed(data_dir: Path, command: str, argv: List[str]) -> None:
+    fm.TODAY = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    fm.DATA_DIR = data_dir
+    fm.SAMPLES_DIR = data_dir.parent / "samples"
+    fm.ALPHA_KEY = None
+    metas = bench_worker.synthetic_universe(SYMBOLS)
+    csv_by_code = {
+        meta.stooq: bench_worker.candles_to_csv(
+            fm.generate_synthetic_candles(meta, days=DAYS)
+        )
+        for meta in metas
+    }
+    fallback_csv = next(iter(csv_by_code.values()))
+    fm.fetch_csv = lambda code, since=None: csv_by_code.get(code, fallback_csv)
+    fm.fetch_alpha_overview = lambda symbol: None
+    if command == "merge":
+        fm.merge_main(argv)
+    else:
+        fm.main(argv)
+
+
+def _spawn(data_dir: Path, command: str, *argv: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, __file__, str(data_dir), command, *argv],
+        cwd=WORKER_DIR,
+        env={**os.environ, "PYTHONPATH": str(WORKER_DIR)},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+
+
+def _wait(*processes: subprocess.Popen) -> None:
+    for process in processes:
+        output, _ = process.communicate(timeout=300)
+        assert process.returncode == 0, output
+
+
+def _aggregate_files(data_dir: Path) -> dict:
+    files = {}
+    for name in AGGREGATES:
+        path = data_dir / name
+        for item in sorted(path.rglob("*.json")) if path.is_dir() else [path]:
+            files[str(item.relative_to(data_dir))] = item.read_bytes()
+    return files
+
+
+def test_merged_shards_match_unsharded_run(tmp_path: Path) -> None:
+    universe = tmp_path / "universe.json"
+    universe.write_text(
+        json.dumps([asdict(meta) for meta in bench_worker.synthetic_universe(SYMBOLS)])
+    )
+    run_args = [
+        "--universe",
+        str(universe),
+        "--workers",
+        "4",
+        "--jobs",
+        "1",
+        "--no-http-cache",
+    ]
+
+    unsharded = tmp_path / "unsharded" / "data"
+    sharded = tmp_path / "sharded" / "data"
+    _wait(
+        _spawn(unsharded, "run", *run_args),
+        *(
+            _spawn(sharded, "run", *run_args, "--shard", f"{shard}/3")
+            for shard in range(3)
+        ),
+    )
+    assert sorted(path.name for path in (sharded / "shards").iterdir()) == [
+        "0-of-3.json",
+        "1-of-3.json",
+        "2-of-3.json",
+    ]
+    _wait(_spawn(sharded, "merge"))
+
+    expected = _aggregate_files(unsharded)
+    assert (
+        "symbols/search_index.json" in expected and "markets/overview.json" in expected
+    )
+    assert _aggregate_files(sharded) == expected
+
+
+if __name__ == "__main__":
+    _stubbed(Path(sys.argv[1]), sys.argv[2], sys.argv[3:])